@@ -34,6 +34,9 @@ class Settings(BaseSettings):
     qianwen_base_url: str = Field(env="QIANWEN_BASE_URL", default="https://dashscope.aliyuncs.com", description="千问API基础URL")
     qianwen_embedding_model: str = Field(env="QIANWEN_EMBEDDING_MODEL", default="text-embedding-v4", description="千问Embedding模型")
     qianwen_rerank_model: str = Field(env="QIANWEN_RERANK_MODEL", default="gte-rerank-v2", description="千问Rerank模型")
+    qianwen_tpm_budget: int = Field(env="QIANWEN_TPM_BUDGET", default=60000, description="千问每分钟token额度")
+    summary_cache_backend: str = Field(env="SUMMARY_CACHE_BACKEND", default="memory", description="摘要缓存后端(memory/redis)")
+    summary_cache_ttl: int = Field(env="SUMMARY_CACHE_TTL", default=604800, description="Redis摘要缓存过期时间(秒)")
     
     # 数据库配置
     database_url: str = Field(env="DATABASE_URL", description="数据库URL")
@@ -6,6 +6,7 @@ Redis客户端配置和连接管理
 import redis
 import json
 import logging
+import threading
 from typing import Optional, Dict, Any
 from app.core.config import get_settings
 
@@ -18,10 +19,16 @@ class RedisClient:
         self.settings = get_settings()
         self._client: Optional[redis.Redis] = None
         self._pubsub: Optional[redis.client.PubSub] = None
+        # 进度发布线程与请求线程可能同时首次取连接，加锁保证只创建一个客户端（及其连接池）
+        self._client_lock = threading.Lock()
         
     def _get_client(self) -> redis.Redis:
         """获取Redis客户端连接"""
-        if self._client is None:
+        if self._client is not None:
+            return self._client
+        with self._client_lock:
+            if self._client is not None:
+                return self._client
             try:
                 # 从配置中解析Redis URL
                 redis_url = self.settings.redis_url
@@ -15,6 +15,7 @@ from .models.metadata_models import (
     KeywordQuality
 )
 from .clients.qianwen_client import QianwenClient
+from .cache.summary_cache import SummaryCache
 
 from .evaluators.quality_evaluator import QualityEvaluator
 
@@ -27,6 +28,8 @@ __all__ = [
     'KeywordQuality',
     # API客户端
     'QianwenClient',
+    # 摘要缓存
+    'SummaryCache',
 
     'QualityEvaluator'
 ]
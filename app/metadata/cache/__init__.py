@@ -0,0 +1,17 @@
+"""摘要缓存模块"""
+
+from .summary_cache import (
+    CacheBackend,
+    RedisSummaryCache,
+    SummaryCache,
+    build_summary_cache_key,
+    get_summary_cache
+)
+
+__all__ = [
+    'CacheBackend',
+    'RedisSummaryCache',
+    'SummaryCache',
+    'build_summary_cache_key',
+    'get_summary_cache'
+]
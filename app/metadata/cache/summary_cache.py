@@ -0,0 +1,236 @@
+"""摘要结果缓存 - 避免对相同文本重复调用千问API"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Protocol, Union
+
+from app.core.config import get_settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Redis摘要缓存的连接/读写超时（秒）：缓存只是加速手段，不应拖慢摘要生成
+REDIS_CACHE_SOCKET_TIMEOUT = 1.0
+
+# Redis连接失败后跳过Redis的冷却时间（秒）
+REDIS_CACHE_COOLDOWN = 30.0
+
+
+class CacheBackend(Protocol):
+    """摘要缓存后端协议，便于替换为Redis等共享存储"""
+
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    async def set(self, key: str, value: str) -> None:
+        ...
+
+
+def build_summary_cache_key(text: str, max_length: int, language: str, model: str) -> str:
+    """构建摘要缓存键
+
+    Args:
+        text: 待摘要的文本
+        max_length: 摘要最大长度
+        language: 摘要语言
+        model: 模型名称
+
+    Returns:
+        缓存键（128位blake2b十六进制摘要）
+    """
+    fields = {"text": text, "max": max_length, "lang": language, "model": model}
+    if ORJSON_AVAILABLE:
+        payload = orjson.dumps(fields, option=orjson.OPT_SORT_KEYS)
+    else:
+        payload = json.dumps(fields, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    # 缓存键不需要密码学强度，blake2b比sha256更快
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class SummaryCache:
+    """进程内摘要LRU缓存"""
+
+    def __init__(self, max_size: int = 2000):
+        """初始化摘要缓存
+
+        Args:
+            max_size: 最大缓存条目数
+        """
+        self.max_size = max_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        # 客户端按线程创建，缓存在线程间共享，因此使用线程锁而非asyncio.Lock
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        """获取缓存的摘要
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存的摘要，未命中时返回None
+        """
+        with self._lock:
+            value = self._cache.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self._hits += 1
+            return value
+
+    async def set(self, key: str, value: str) -> None:
+        """写入摘要缓存
+
+        Args:
+            key: 缓存键
+            value: 摘要内容
+        """
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+            elif len(self._cache) >= self.max_size:
+                self._cache.popitem(last=False)
+            self._cache[key] = value
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._cache.clear()
+            self._hits = 0
+            self._misses = 0
+        logger.info("摘要缓存已清空")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        total = self._hits + self._misses
+        return {
+            "size": len(self._cache),
+            "max_size": self.max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": self._hits / max(1, total)
+        }
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+class RedisSummaryCache:
+    """基于Redis的摘要缓存，跨进程共享并在worker重启后保留"""
+
+    def __init__(self, redis_url: str, ttl: int = 7 * 24 * 3600, key_prefix: str = "summary_cache:",
+                 cooldown: float = REDIS_CACHE_COOLDOWN):
+        """初始化Redis摘要缓存
+
+        Args:
+            redis_url: Redis连接URL
+            ttl: 缓存过期时间（秒）
+            key_prefix: 缓存键前缀
+            cooldown: Redis访问失败后不再访问Redis的时间（秒），期间读视为未命中、写直接跳过
+        """
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self.cooldown = cooldown
+        # 冷却截止时间（time.monotonic），之前的读写不访问Redis
+        self._unavailable_until = 0.0
+        # redis.asyncio连接绑定事件循环，每个事件循环各自创建
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _get_client(self):
+        """获取当前事件循环下的Redis客户端"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None:
+                import redis.asyncio as aioredis
+                client = aioredis.from_url(
+                    self.redis_url,
+                    decode_responses=True,
+                    encoding="utf-8",
+                    socket_connect_timeout=REDIS_CACHE_SOCKET_TIMEOUT,
+                    socket_timeout=REDIS_CACHE_SOCKET_TIMEOUT
+                )
+                self._clients[loop] = client
+            return client
+
+    def _is_available(self) -> bool:
+        """Redis是否可访问（不在失败后的冷却期内）"""
+        return time.monotonic() >= self._unavailable_until
+
+    def _mark_unavailable(self, action: str, error: Exception) -> None:
+        """记录Redis访问失败并进入冷却期"""
+        self._unavailable_until = time.monotonic() + self.cooldown
+        logger.warning(f"{action}Redis摘要缓存失败，{self.cooldown:.0f}秒内跳过Redis: {error}")
+
+    async def get(self, key: str) -> Optional[str]:
+        """获取缓存的摘要，Redis不可用或处于冷却期时视为未命中"""
+        value = None
+        if self._is_available():
+            try:
+                value = await self._get_client().get(self.key_prefix + key)
+            except Exception as e:
+                self._mark_unavailable("读取", e)
+        if value is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        """写入摘要缓存，失败时仅记录日志，冷却期内直接跳过"""
+        if not self._is_available():
+            return
+        try:
+            await self._get_client().setex(self.key_prefix + key, self.ttl, value)
+        except Exception as e:
+            self._mark_unavailable("写入", e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        total = self._hits + self._misses
+        return {
+            "backend": "redis",
+            "ttl": self.ttl,
+            "available": self._is_available(),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": self._hits / max(1, total)
+        }
+
+
+# 全局摘要缓存实例（跨线程的客户端实例共享）
+_summary_cache: Optional[Union[SummaryCache, RedisSummaryCache]] = None
+
+
+def get_summary_cache() -> Union[SummaryCache, RedisSummaryCache]:
+    """获取全局摘要缓存实例（单例模式）
+
+    根据配置summary_cache_backend选择进程内缓存(memory)或Redis缓存(redis)
+    """
+    global _summary_cache
+    if _summary_cache is None:
+        settings = get_settings()
+        if settings.summary_cache_backend == "redis":
+            _summary_cache = RedisSummaryCache(settings.redis_url, ttl=settings.summary_cache_ttl)
+            logger.info("摘要缓存使用Redis后端")
+        else:
+            _summary_cache = SummaryCache()
+    return _summary_cache
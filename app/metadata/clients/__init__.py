@@ -1,7 +1,9 @@
 """千问API客户端模块"""
 
-from .qianwen_client import QianwenClient
+from .qianwen_client import QianwenClient, QianwenAPIError, RateLimitError
 
 __all__ = [
-    'QianwenClient'
-]
\ No newline at end of file
+    'QianwenClient',
+    'QianwenAPIError',
+    'RateLimitError'
+]
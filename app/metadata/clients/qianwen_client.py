@@ -3,24 +3,92 @@
 import asyncio
 import aiohttp
 import json
-from typing import Dict, Any, Optional, List
+import random
+import statistics
+import time
+from collections import deque
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Any, Optional, List, Tuple
 import logging
-from datetime import datetime
 
 from app.core.config import get_settings
 from app.utils.logger import setup_logger
+from app.metadata.cache.summary_cache import CacheBackend, build_summary_cache_key, get_summary_cache
+from app.metadata.clients.token_budget import TokenBudgetLimiter
 
 logger = setup_logger(__name__)
 
+# 摘要用户提示词前缀，动态文本放在末尾以便服务端前缀缓存命中
+_SUMMARY_PROMPT_PREFIX = "请为以下文本生成摘要：\n\n"
+
+
+@lru_cache(maxsize=32)
+def _build_summary_system_prompt(max_length: int, language: str) -> str:
+    """构建摘要系统提示词（按摘要长度和语言缓存）"""
+    return f"""你是一个专业的文本摘要生成助手。请根据以下要求生成摘要：
+1. 摘要语言：{language}
+2. 摘要长度：不超过{max_length}字
+3. 保持原文的核心信息和关键观点
+4. 使用简洁、准确的语言
+5. 如果是医学文本，请保留重要的医学术语
+6. 直接输出摘要内容，不要添加额外的说明"""
+
+
+class QianwenAPIError(Exception):
+    """千问API调用错误"""
+    
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class RateLimitError(QianwenAPIError):
+    """千问API限流错误(HTTP 429)"""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message, status=429)
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析Retry-After响应头（仅支持秒数格式）"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
 class QianwenClient:
     """千问API客户端 - 专用于元数据摘要生成"""
     
-    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        summary_cache: Optional[CacheBackend] = None,
+        enable_summary_cache: bool = True,
+        max_concurrency: int = 5,
+        tpm_budget: Optional[int] = None,
+        skip_short_texts: bool = True,
+        pool_size: Optional[int] = None,
+        max_retries: int = 3,
+        retry_delay: float = 1.0
+    ):
         """初始化千问客户端
         
         Args:
             api_key: API密钥，如果不提供则从配置中获取
             base_url: API基础URL，如果不提供则从配置中获取
+            summary_cache: 摘要缓存后端，默认使用全局进程内缓存
+            enable_summary_cache: 是否启用摘要缓存
+            max_concurrency: 摘要请求最大并发数
+            tpm_budget: 每分钟token额度，如果不提供则从配置中获取
+            skip_short_texts: 文本不超过摘要长度时直接返回原文，不调用API
+            pool_size: HTTP连接池大小，默认max(max_concurrency*4, 32)
+            max_retries: 限流、服务端错误或网络错误时的最大重试次数
+            retry_delay: 指数退避的基础等待时间（秒）
         """
         self.settings = get_settings()
         self.api_key = api_key or self.settings.qianwen_api_key
@@ -31,6 +99,11 @@ class QianwenClient:
         self.max_tokens = 2048
         self.temperature = 0.3
         
+        # 重试配置
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = 30.0
+        
         if not self.api_key:
             raise ValueError("QIANWEN_API_KEY未设置")
         
@@ -43,13 +116,39 @@ class QianwenClient:
         }
         
         # 连接池配置
+        self.pool_size = pool_size or max(max_concurrency * 4, 32)
         self.connector = None
         self.session = None
+        self._warmed_up = False
+        
+        # 短文本直接作为摘要
+        self.skip_short_texts = skip_short_texts
+        
+        # 摘要缓存：相同文本不重复调用API
+        self.enable_summary_cache = enable_summary_cache
+        self.summary_cache = summary_cache or get_summary_cache()
+        
+        # 并发控制：信号量绑定事件循环，首次使用时创建
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        
+        # TPM限流：按文本长度扣减token额度，60秒后归还
+        self.token_limiter = TokenBudgetLimiter(
+            budget=tpm_budget or self.settings.qianwen_tpm_budget,
+            refund_time=60.0
+        )
         
         # 请求统计
         self.request_count = 0
         self.error_count = 0
         self.total_tokens = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.retry_count = 0
+        self.rate_limited_count = 0
+        # 最近摘要耗时（秒），用于计算延迟分位数
+        self._latencies: deque = deque(maxlen=1000)
         
         logger.info(f"千问客户端初始化完成 - 模型: {self.default_model}")
     
@@ -62,9 +161,10 @@ class QianwenClient:
             except:
                 pass
         
+        # 所有请求都发往同一主机，单主机连接数与总连接数一致
         self.connector = aiohttp.TCPConnector(
-            limit=20,
-            limit_per_host=5,
+            limit=self.pool_size,
+            limit_per_host=self.pool_size,
             ttl_dns_cache=300,
             use_dns_cache=True,
             keepalive_timeout=30
@@ -81,6 +181,7 @@ class QianwenClient:
             headers=self.headers,
             timeout=aiohttp.ClientTimeout(total=60)  # 文本生成可能需要更长时间
         )
+        self._warmed_up = False
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -90,6 +191,14 @@ class QianwenClient:
         if self.connector:
             await self.connector.close()
     
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """获取当前事件循环下的并发信号量"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
     async def generate_text(
         self,
         prompt: str,
@@ -144,44 +253,99 @@ class QianwenClient:
             if not hasattr(self, 'session') or not self.session or self.session.closed:
                 await self.__aenter__()
             
-            self.request_count += 1
-            start_time = datetime.now()
-            
-            async with self.session.post(url, json=payload) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    self.error_count += 1
-                    logger.error(f"千问文本生成API错误: {response.status} - {error_text}")
-                    raise Exception(f"文本生成API调用失败: {response.status} - {error_text}")
-                
-                result = await response.json()
-                
-                # 解析响应
-                if 'choices' not in result or not result['choices']:
-                    raise Exception("API响应格式错误：缺少choices字段")
-                
-                choice = result['choices'][0]
-                if 'message' not in choice or 'content' not in choice['message']:
-                    raise Exception("API响应格式错误：缺少message.content字段")
-                
-                generated_text = choice['message']['content'].strip()
-                
-                # 统计token使用量
-                if 'usage' in result:
-                    usage = result['usage']
-                    self.total_tokens += usage.get('total_tokens', 0)
-                
-                # 记录请求时间
-                duration = (datetime.now() - start_time).total_seconds()
-                
-                logger.debug(f"文本生成完成 - 耗时: {duration:.2f}s, 长度: {len(generated_text)}")
-                return generated_text
+            for attempt in range(self.max_retries + 1):
+                try:
+                    return await self._post_chat_completion(url, payload)
+                except Exception as e:
+                    if attempt >= self.max_retries or not self._is_retryable(e):
+                        raise
+                    self.retry_count += 1
+                    delay = self._get_retry_delay(attempt, e)
+                    logger.warning(f"文本生成请求失败，{delay:.2f}s后重试 ({attempt + 1}/{self.max_retries}): {str(e)}")
+                    await asyncio.sleep(delay)
                 
         except Exception as e:
             self.error_count += 1
             logger.error(f"文本生成失败: {str(e)}")
             raise
     
+    async def _post_chat_completion(self, url: str, payload: Dict[str, Any]) -> str:
+        """发送一次文本生成请求
+        
+        Args:
+            url: 接口地址
+            payload: 请求体
+            
+        Returns:
+            生成的文本内容
+        """
+        self.request_count += 1
+        start_time = time.perf_counter()
+        
+        async with self.session.post(url, json=payload) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                self.error_count += 1
+                logger.error(f"千问文本生成API错误: {response.status} - {error_text}")
+                if response.status == 429:
+                    self.rate_limited_count += 1
+                    raise RateLimitError(
+                        f"文本生成API限流: {response.status} - {error_text}",
+                        retry_after=_parse_retry_after(response.headers.get("Retry-After"))
+                    )
+                raise QianwenAPIError(f"文本生成API调用失败: {response.status} - {error_text}", status=response.status)
+            
+            result = await response.json()
+            
+            # 解析响应
+            if 'choices' not in result or not result['choices']:
+                raise Exception("API响应格式错误：缺少choices字段")
+            
+            choice = result['choices'][0]
+            if 'message' not in choice or 'content' not in choice['message']:
+                raise Exception("API响应格式错误：缺少message.content字段")
+            
+            generated_text = choice['message']['content'].strip()
+            
+            # 统计token使用量
+            if 'usage' in result:
+                usage = result['usage']
+                self.total_tokens += usage.get('total_tokens', 0)
+            
+            # 记录请求时间
+            duration = time.perf_counter() - start_time
+            
+            logger.debug(f"文本生成完成 - 耗时: {duration:.2f}s, 长度: {len(generated_text)}")
+            return generated_text
+    
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """判断错误是否可重试：限流、服务端错误和网络错误"""
+        if isinstance(error, RateLimitError):
+            return True
+        if isinstance(error, QianwenAPIError):
+            return error.status is not None and error.status >= 500
+        return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+    
+    def _get_retry_delay(self, attempt: int, error: Exception) -> float:
+        """计算重试等待时间
+        
+        优先遵循服务端返回的Retry-After，否则使用全抖动指数退避，
+        避免多个客户端在限流后同时重试
+        
+        Args:
+            attempt: 当前重试次数（从0开始）
+            error: 触发重试的错误
+            
+        Returns:
+            等待秒数
+        """
+        if isinstance(error, RateLimitError) and error.retry_after:
+            delay = error.retry_after
+        else:
+            delay = random.uniform(0, self.retry_delay * (2 ** attempt))
+        return min(delay, self.max_retry_delay)
+    
     async def generate_summary(
         self,
         text: str,
@@ -198,22 +362,123 @@ class QianwenClient:
         Returns:
             生成的摘要
         """
-        system_prompt = f"""你是一个专业的文本摘要生成助手。请根据以下要求生成摘要：
-1. 摘要语言：{language}
-2. 摘要长度：不超过{max_length}字
-3. 保持原文的核心信息和关键观点
-4. 使用简洁、准确的语言
-5. 如果是医学文本，请保留重要的医学术语
-6. 直接输出摘要内容，不要添加额外的说明"""
+        # 原文已不超过摘要长度，摘要不会更短也不会更完整
+        if self.skip_short_texts and len(text) <= max_length:
+            logger.debug(f"文本长度未超过摘要长度，直接返回原文 - 文本长度: {len(text)}")
+            return text
         
-        prompt = f"请为以下文本生成摘要：\n\n{text}"
+        cache_key = None
+        if self.enable_summary_cache:
+            cache_key = build_summary_cache_key(text, max_length, language, self.default_model)
+            cached = await self.summary_cache.get(cache_key)
+            if cached is not None:
+                self.cache_hits += 1
+                logger.debug(f"摘要缓存命中 - 文本长度: {len(text)}")
+                return cached
+            self.cache_misses += 1
         
-        return await self.generate_text(
-            prompt=prompt,
-            system_prompt=system_prompt,
-            max_tokens=max_length + 100,  # 留一些余量
-            temperature=0.3
-        )
+        system_prompt = _build_summary_system_prompt(max_length, language)
+        prompt = "".join((_SUMMARY_PROMPT_PREFIX, text))
+        
+        start_time = time.perf_counter()
+        credits = self.token_limiter.estimate_credits(text, max_length)
+        await self.token_limiter.acquire(credits)
+        try:
+            async with self._get_semaphore():
+                summary = await self.generate_text(
+                    prompt=prompt,
+                    system_prompt=system_prompt,
+                    max_tokens=max_length + 100,  # 留一些余量
+                    temperature=0.3
+                )
+        finally:
+            self.token_limiter.release_later(credits)
+        
+        self._latencies.append(time.perf_counter() - start_time)
+        
+        if cache_key and summary:
+            await self.summary_cache.set(cache_key, summary)
+        
+        return summary
+    
+    async def _iter_summary_results(
+        self,
+        items: List[Tuple[Any, str]],
+        max_length: int,
+        language: str
+    ):
+        """以有界任务池生成摘要，按完成顺序产出结果
+        
+        始终保持最多max_concurrency个任务在途，任一任务完成即补充新任务，
+        避免慢请求阻塞同批次的其他请求
+        
+        Args:
+            items: (标识, 文本) 列表
+            max_length: 摘要最大长度
+            language: 摘要语言
+            
+        Yields:
+            (标识, 摘要或异常)
+        """
+        async def _run(key, text):
+            try:
+                return key, await self.generate_summary(text, max_length, language)
+            except Exception as e:
+                return key, e
+        
+        queue = iter(items)
+        pending = set()
+        try:
+            while True:
+                for key, text in queue:
+                    pending.add(asyncio.ensure_future(_run(key, text)))
+                    if len(pending) >= self.max_concurrency:
+                        break
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def iter_generate_summaries(
+        self,
+        texts: List[str],
+        max_length: int = 200,
+        language: str = "中文"
+    ) -> AsyncIterator[Tuple[int, str]]:
+        """流式批量生成摘要，按完成顺序产出结果
+        
+        以有界任务池提交请求，由token额度与信号量共同限制在途请求；
+        批次内重复的文本只请求一次，结果回填到所有对应位置。
+        调用方可在摘要陆续完成时进行后续写入，与API延迟重叠
+        
+        Args:
+            texts: 待摘要的文本列表
+            max_length: 摘要最大长度
+            language: 摘要语言
+            
+        Yields:
+            (原始索引, 摘要)，失败时摘要为空字符串
+        """
+        # 按文本内容去重，记录每个唯一文本对应的原始索引
+        unique_texts: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            unique_texts.setdefault(text, []).append(i)
+        
+        if len(unique_texts) < len(texts):
+            logger.debug(f"批量摘要去重: {len(texts)} -> {len(unique_texts)}")
+        
+        items = [(tuple(indices), text) for text, indices in unique_texts.items()]
+        
+        async for indices, result in self._iter_summary_results(items, max_length, language):
+            if isinstance(result, Exception):
+                logger.error(f"批量摘要生成失败 (索引 {list(indices)}): {str(result)}")
+                result = ""  # 失败时返回空摘要
+            for i in indices:
+                yield i, result
     
     async def batch_generate_summaries(
         self,
@@ -228,32 +493,55 @@ class QianwenClient:
             texts: 待摘要的文本列表
             max_length: 摘要最大长度
             language: 摘要语言
-            batch_delay: 批次间延迟（秒）
+            batch_delay: 已废弃，保留仅为兼容旧调用，传入的值会被忽略；
+                请求节奏由max_concurrency和token额度控制
             
         Returns:
-            摘要列表
+            摘要列表，与输入顺序一致
         """
-        summaries = []
-        
-        for i, text in enumerate(texts):
-            try:
-                summary = await self.generate_summary(text, max_length, language)
-                summaries.append(summary)
-                
-                # 避免请求过于频繁
-                if i < len(texts) - 1:
-                    await asyncio.sleep(batch_delay)
-                    
-            except Exception as e:
-                logger.error(f"批量摘要生成失败 (索引 {i}): {str(e)}")
-                summaries.append("")  # 失败时添加空摘要
+        summaries = [""] * len(texts)
+        async for i, summary in self.iter_generate_summaries(texts, max_length, language):
+            summaries[i] = summary
         
         logger.info(f"批量摘要生成完成: {len([s for s in summaries if s])}/{len(texts)}")
         return summaries
     
+    async def warm_up(self, connections: Optional[int] = None) -> int:
+        """预热连接池
+        
+        并发发送轻量HEAD请求，提前完成TLS握手并保持keep-alive连接
+        
+        Args:
+            connections: 预热连接数，默认为连接池大小
+            
+        Returns:
+            成功建立的连接数
+        """
+        if not hasattr(self, 'session') or not self.session or self.session.closed:
+            await self.__aenter__()
+        
+        count = connections or self.pool_size
+        
+        async def _head() -> bool:
+            try:
+                async with self.session.head(self.base_url, timeout=aiohttp.ClientTimeout(total=5)):
+                    return True
+            except Exception:
+                return False
+        
+        results = await asyncio.gather(*[_head() for _ in range(count)])
+        self._warmed_up = True
+        warmed = sum(results)
+        logger.info(f"千问连接池预热完成: {warmed}/{count}")
+        return warmed
+    
     async def health_check(self) -> bool:
         """健康检查"""
         try:
+            # 首次检查时预热连接池
+            if not self._warmed_up:
+                await self.warm_up()
+            
             # 使用简单的文本生成测试API可用性
             test_prompt = "请说'健康检查通过'"
             result = await self.generate_text(
@@ -275,20 +563,45 @@ class QianwenClient:
     
     def get_stats(self) -> Dict[str, Any]:
         """获取客户端统计信息"""
-        return {
+        cache_lookups = self.cache_hits + self.cache_misses
+        stats = {
             "total_requests": self.request_count,
             "request_count": self.request_count,
             "error_count": self.error_count,
             "success_rate": (self.request_count - self.error_count) / max(self.request_count, 1),
             "total_tokens": self.total_tokens,
-            "model": self.default_model
+            "model": self.default_model,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": self.cache_hits / max(cache_lookups, 1),
+            "retry_count": self.retry_count,
+            "rate_limited_count": self.rate_limited_count,
+            "latency_p50": None,
+            "latency_p95": None,
+            "latency_p99": None
         }
+        
+        # 至少两个样本才能计算分位数
+        if len(self._latencies) >= 2:
+            quantiles = statistics.quantiles(self._latencies, n=100)
+            stats["latency_p50"] = quantiles[49]
+            stats["latency_p95"] = quantiles[94]
+            stats["latency_p99"] = quantiles[98]
+        elif self._latencies:
+            stats["latency_p50"] = stats["latency_p95"] = stats["latency_p99"] = self._latencies[0]
+        
+        return stats
     
     def reset_stats(self):
         """重置统计信息"""
         self.request_count = 0
         self.error_count = 0
         self.total_tokens = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.retry_count = 0
+        self.rate_limited_count = 0
+        self._latencies.clear()
         logger.info("客户端统计信息已重置")
     
     async def close(self):
@@ -0,0 +1,87 @@
+"""Token预算限流器 - 按每分钟token额度(TPM)控制千问API调用"""
+
+import asyncio
+from typing import Optional
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class TokenBudgetLimiter:
+    """基于额度的信号量
+
+    每次请求按预估token数扣减额度，额度在refund_time秒后归还，
+    从而按请求大小而非请求个数来限制并发。
+    """
+
+    def __init__(self, budget: int = 60000, refund_time: float = 60.0):
+        """初始化限流器
+
+        Args:
+            budget: 时间窗口内可用的token额度
+            refund_time: 额度归还延迟（秒）
+        """
+        self.budget = budget
+        self.refund_time = refund_time
+        self._available = budget
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        """获取当前事件循环下的条件变量"""
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            # 事件循环切换后，旧循环上的待归还额度不会再触发，直接重置
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self._available = self.budget
+        return self._condition
+
+    def estimate_credits(self, text: str, max_length: int) -> int:
+        """估算一次摘要请求消耗的token额度
+
+        Args:
+            text: 待摘要的文本
+            max_length: 摘要最大长度
+
+        Returns:
+            预估token数（不超过总额度，避免单个请求永远无法获得额度）
+        """
+        return min(self.budget, max(1, len(text) // 3 + max_length))
+
+    async def acquire(self, credits: int) -> None:
+        """等待并扣减额度
+
+        Args:
+            credits: 需要的额度
+        """
+        condition = self._get_condition()
+        async with condition:
+            if self._available < credits:
+                logger.debug(f"token额度不足，等待归还 - 需要: {credits}, 可用: {self._available}")
+            await condition.wait_for(lambda: self._available >= credits)
+            self._available -= credits
+
+    def release_later(self, credits: int) -> None:
+        """在refund_time秒后归还额度
+
+        Args:
+            credits: 归还的额度
+        """
+        loop = asyncio.get_running_loop()
+        loop.call_later(self.refund_time, lambda: asyncio.ensure_future(self._refund(credits, loop)))
+
+    async def _refund(self, credits: int, loop) -> None:
+        """归还额度并唤醒等待者"""
+        if self._loop is not loop:
+            return
+        condition = self._get_condition()
+        async with condition:
+            self._available = min(self.budget, self._available + credits)
+            condition.notify_all()
+
+    @property
+    def available(self) -> int:
+        """当前可用额度"""
+        return self._available
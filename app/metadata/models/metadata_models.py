@@ -46,6 +46,11 @@ class QualityLevel(str, Enum):
     POOR = "poor"           # 0.0-0.4
 
 
+# 摘要内容最大长度及截断后缀
+SUMMARY_MAX_CONTENT_LENGTH = 200
+SUMMARY_ELLIPSIS = "..."
+
+
 class DocumentSummary(BaseModel):
     """文档摘要数据模型"""
     
@@ -70,12 +75,13 @@ class DocumentSummary(BaseModel):
     
     @validator('content')
     def validate_content(cls, v):
-        if not v or not v.strip():
+        stripped = v.strip() if v else ""
+        if not stripped:
             raise ValueError("摘要内容不能为空")
-        # 如果摘要超过200字符，自动截断
-        if len(v) > 200:
-            v = v[:200] + "..."
-        return v.strip()
+        # 未超长时直接返回，超过200字符时按码点截断（末尾省略号无需再去除空白）
+        if len(v) <= SUMMARY_MAX_CONTENT_LENGTH:
+            return stripped
+        return v[:SUMMARY_MAX_CONTENT_LENGTH].lstrip() + SUMMARY_ELLIPSIS
     
     @validator('length', always=True)
     def set_length(cls, v, values):
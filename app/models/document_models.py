@@ -3,8 +3,9 @@
 """
 
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_serializer, validator
 from datetime import datetime
+import numpy as np
 
 
 class Document(BaseModel):
@@ -52,7 +53,42 @@ class DocumentChunk(BaseModel):
     chunk_type: str = "text"  # text, table, reference, image
     page_number: Optional[int] = None
     metadata: Dict[str, Any] = Field(default_factory=dict)
-    embedding: Optional[List[float]] = None
+    # 嵌入向量以float32原始字节存储，比List[float]节省约8倍内存
+    embedding: Optional[bytes] = None
+
+    @validator('embedding', pre=True)
+    def validate_embedding(cls, v):
+        """将列表或数组形式的嵌入向量转换为float32字节"""
+        if v is None or isinstance(v, bytes):
+            return v
+        return np.asarray(v, dtype=np.float32).tobytes()
+
+    @field_serializer('embedding', when_used='json')
+    def serialize_embedding(self, v: Optional[bytes]) -> Optional[List[float]]:
+        """JSON序列化时输出浮点数列表"""
+        if v is None:
+            return None
+        return np.frombuffer(v, dtype=np.float32).tolist()
+
+    @property
+    def embedding_np(self) -> Optional[np.ndarray]:
+        """嵌入向量的只读NumPy视图（不复制数据）"""
+        if self.embedding is None:
+            return None
+        return np.frombuffer(self.embedding, dtype=np.float32)
+
+    @classmethod
+    def from_numpy(cls, embedding: np.ndarray, **kwargs) -> "DocumentChunk":
+        """从NumPy数组创建文档块
+
+        Args:
+            embedding: 嵌入向量
+            **kwargs: 其他字段
+
+        Returns:
+            文档块
+        """
+        return cls(embedding=np.ascontiguousarray(embedding, dtype=np.float32).tobytes(), **kwargs)
 
 
 class ProcessingResult(BaseModel):
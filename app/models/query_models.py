@@ -3,7 +3,7 @@
 """
 
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
 
@@ -19,6 +19,9 @@ class QueryRequest(BaseModel):
 
 class QueryResponse(BaseModel):
     """查询响应模型"""
+    # 构建后只读
+    model_config = ConfigDict(frozen=True)
+
     query: str = Field(..., description="原始查询")
     response: str = Field(..., description="生成的回答")
     documents: List[str] = Field(default_factory=list, description="参考文档片段")
@@ -32,6 +35,9 @@ class QueryResponse(BaseModel):
 
 class ChatMessage(BaseModel):
     """聊天消息模型"""
+    # 构建后只读
+    model_config = ConfigDict(frozen=True)
+
     id: Optional[str] = None
     session_id: str
     message_type: str = "user"  # user, assistant, system
@@ -42,6 +48,9 @@ class ChatMessage(BaseModel):
 
 class SearchResult(BaseModel):
     """搜索结果模型"""
+    # 构建后只读
+    model_config = ConfigDict(frozen=True)
+
     content: str = Field(..., description="文档内容")
     score: float = Field(..., ge=0.0, le=1.0, description="相关性分数")
     source: str = Field(..., description="来源文档")
@@ -3,12 +3,45 @@ Text Cleaning Module for Medical Documents
 医疗文档文本清洗模块
 """
 
+import logging
 import re
-from typing import Dict, List, Set, Optional, Tuple
+import threading
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Dict, List, Pattern, Set, Optional, Tuple
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    logger.info("pyahocorasick not available, using regex abbreviation matching")
+    AHOCORASICK_AVAILABLE = False
+
+# Full-width digit/letter to ASCII mapping (OCR errors), applied with str.translate
+_FULLWIDTH_TABLE = str.maketrans(
+    '０１２３４５６７８９'
+    'ＡＢＣＤＥＦＧＨＩＪＫＬＭＮＯＰＱＲＳＴＵＶＷＸＹＺａｂｃｄｅｆｇｈｉｊｋｌｍｎｏｐｑｒｓｔｕｖｗｘｙｚ',
+    '0123456789'
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+)
+
+# Characters that IGNORECASE regex matching treats as equal to ASCII letters
+# but str.lower() does not fold
+_CASE_FOLD_EXTRAS = str.maketrans({'\u0131': 'i', '\u017f': 's'})
+
+# Characters outside the allowed set (PDF conversion garbage)
+_GARBAGE_CHARS = r'[^\w\s\u4e00-\u9fff\u3000-\u303f\uff00-\uffef.,;:!?()[\]{}""''—–\-+*/=<>@#$%^&|\\~`]+'
+
+# Joins texts in clean_batch; the line breaks keep every batched noise pass
+# from matching across documents
+_BATCH_SEPARATOR = '\n\x1e\n'
+
+# Number of merged custom-term matchers kept by normalize_medical_terms
+CUSTOM_TERM_CACHE_SIZE = 16
+
 
 class TextCleaner:
     """Text cleaning utilities for medical documents"""
@@ -17,61 +50,118 @@ class TextCleaner:
         """Initialize text cleaner with predefined patterns"""
         self.noise_patterns = self._init_noise_patterns()
         self.header_footer_patterns = self._init_header_footer_patterns()
+        self._header_footer_prefixes, self._header_footer_pattern = self._split_header_footer_patterns(
+            self.header_footer_patterns
+        )
         self.medical_abbreviations = self._init_medical_abbreviations()
-        
-    def _init_noise_patterns(self) -> List[Tuple[str, str]]:
+        self.abbreviation_pattern, self.abbreviation_terms = self._compile_abbreviation_pattern(self.medical_abbreviations)
+        self.abbreviation_automaton = self._build_abbreviation_automaton(self.medical_abbreviations)
+        # Per-abbreviation patterns for sequential normalization
+        self._abbreviation_patterns = {
+            abbrev: self._compile_single_abbreviation(abbrev) for abbrev in self.medical_abbreviations
+        }
+        # LRU cache of (automaton, pattern, terms) per custom dictionary
+        self._custom_term_cache: "OrderedDict[Tuple[Tuple[str, str], ...], tuple]" = OrderedDict()
+        self._custom_term_lock = threading.Lock()
+        # Newlines are kept so a whole text can be normalized in one call and split into lines
+        self._non_word_pattern = re.compile(r'[^\w\u4e00-\u9fff\n]')
+        self._structure_pattern = self._compile_structure_pattern()
+        
+    def _init_noise_patterns(self) -> List[Tuple[Pattern, str, Optional[Tuple[str, ...]], bool]]:
         """Initialize noise removal patterns
         
+        Each pattern carries its guard: substrings of which the text must
+        contain at least one for the pattern to match, checked with plain `in`
+        tests before invoking the regex engine. None means the pattern has no
+        cheap guard and always runs.
+        
+        Text-scoped patterns are anchored to the whole text or can run across
+        line breaks, so clean_batch applies them to each text on its own.
+        
         Returns:
-            List of (pattern, replacement) tuples
+            List of (compiled pattern, replacement, guard, text_scoped) tuples
         """
-        return [
+        
+        # Patterns are fused into a few alternations so the text is scanned
+        # once per group instead of once per pattern. Groups only contain
+        # patterns over disjoint inputs (or deletions that do not feed each
+        # other), and the groups keep the original application order.
+        # Inner whitespace runs are handled by the final whitespace
+        # normalization in clean_basic.
+        patterns = [
             # PDF conversion artifacts
-            (r'书书书+', ''),
-            (r'[^\w\s\u4e00-\u9fff\u3000-\u303f\uff00-\uffef.,;:!?()[\]{}""''—–\-+*/=<>@#$%^&|\\~`]+', ''),
-            
-            # Excessive whitespace and line breaks
-            (r'\n\s*\n\s*\n+', '\n\n'),  # Multiple line breaks
-            (r'[ \t]+', ' '),  # Multiple spaces/tabs
-            (r'^\s+|\s+$', ''),  # Leading/trailing whitespace
+            (r'书书书+|' + _GARBAGE_CHARS, '', None, False),
             
-            # OCR errors and garbled text
-            (r'[０-９]+', lambda m: str(int(m.group().replace('０', '0').replace('１', '1').replace('２', '2').replace('３', '3').replace('４', '4').replace('５', '5').replace('６', '6').replace('７', '7').replace('８', '8').replace('９', '9')))),  # Full-width numbers
-            (r'[Ａ-Ｚａ-ｚ]+', lambda m: m.group().translate(str.maketrans('ＡＢＣＤＥＦＧＨＩＪＫＬＭＮＯＰＱＲＳＴＵＶＷＸＹＺａｂｃｄｅｆｇｈｉｊｋｌｍｎｏｐｑｒｓｔｕｖｗｘｙｚ', 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'))),  # Full-width letters
+            # Leading/trailing whitespace (before the DOI/ISSN passes, which
+            # would otherwise match a marker's trailing whitespace)
+            (r'^\s+|\s+$', '', None, True),
             
-            # Repeated punctuation
-            (r'[。，；：！？]{2,}', lambda m: m.group()[0]),
-            (r'[.,:;!?]{2,}', lambda m: m.group()[0]),
+            # Repeated punctuation collapses to its first mark (full-width
+            # numbers/letters are translated up front in clean_basic)
+            (r'([。，；：！？])[。，；：！？]+|([.,:;!?])[.,:;!?]+', r'\1\2', None, False),
             
-            # Page numbers and references
-            (r'^\s*第?\s*[0-9]+\s*页?\s*$', ''),  # Page numbers
-            (r'^\s*Page\s+\d+\s*$', ''),  # English page numbers
-            (r'^\s*-\s*\d+\s*-\s*$', ''),  # Page separators
+            # Page numbers: Chinese/Arabic, English and "- n -" separators
+            (r'^\s*(?:第?\s*[0-9]+\s*页?|Page\s+\d+|-\s*\d+\s*-)\s*$', '', None, True),
             
-            # DOI and ISSN patterns
-            (r'DOI[:：]\s*[^\n]+', ''),
-            (r'ISSN[:：]\s*[^\n]+', ''),
-            (r'doi[:：]\s*[^\n]+', ''),
+            # DOI and ISSN patterns remove the rest of the line (or the next
+            # line after a bare marker). They stay separate, ordered passes:
+            # one alternation would pick a different match when markers share
+            # a line. They run before the email/URL group.
+            (r'DOI[:：]\s*[^\n]+', '', ('DOI',), True),
+            (r'ISSN[:：]\s*[^\n]+', '', ('ISSN',), True),
+            (r'doi[:：]\s*[^\n]+', '', ('doi',), True),
             
             # Email addresses (often in headers/footers)
-            (r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', ''),
+            (r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '', ('@',), False),
             
             # URLs
-            (r'https?://[^\s]+', ''),
-            (r'www\.[^\s]+', ''),
+            (r'https?://[^\s]+|www\.[^\s]+', '', ('http', 'www.'), False),
             
-            # Excessive punctuation marks
-            (r'[·•\-=]{3,}', ''),  # Separator lines
-            (r'[*]{3,}', ''),  # Asterisk lines
+            # Excessive punctuation marks: separator and asterisk lines
+            (r'[·•\-=]{3,}|[*]{3,}', '', ('·', '•', '-', '=', '***'), False),
+        ]
+        return [
+            (re.compile(pattern), replacement, guard, text_scoped)
+            for pattern, replacement, guard, text_scoped in patterns
         ]
     
-    def _init_header_footer_patterns(self) -> List[str]:
+    @staticmethod
+    def _passes_noise_guard(guard: Optional[Tuple[str, ...]], text: str) -> bool:
+        """Check whether a noise pattern with the given guard may match text
+        
+        Args:
+            guard: Guard substrings of the pattern, or None
+            text: Current text
+            
+        Returns:
+            False if the guard substrings are all absent
+        """
+        return guard is None or any(literal in text for literal in guard)
+    
+    def _apply_noise_patterns(self, text: str) -> str:
+        """Apply noise removal patterns in order
+        
+        Passes whose guard substrings are absent from the current text are
+        skipped.
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Text with noise removed
+        """
+        for pattern, replacement, guard, _ in self.noise_patterns:
+            if self._passes_noise_guard(guard, text):
+                text = pattern.sub(replacement, text)
+        return text
+    
+    def _init_header_footer_patterns(self) -> List[Pattern]:
         """Initialize header/footer detection patterns
         
         Returns:
-            List of regex patterns for headers/footers
+            List of compiled (case-insensitive) patterns for headers/footers
         """
-        return [
+        patterns = [
             r'^·\s*标\s*准\s*与\s*规\s*范\s*·',  # Standards and specifications
             r'^·\s*指南与共识\s*·',  # Guidelines and consensus
             r'^·\s*综\s*述\s*·',  # Review articles
@@ -91,6 +181,50 @@ class TextCleaner:
             r'^No\.\s*\d+',  # Issue number
             r'^\d+年第\d+期',  # Chinese volume/issue
         ]
+        return [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+    
+    @staticmethod
+    def _split_header_footer_patterns(
+        patterns: List[Pattern]
+    ) -> Tuple[Tuple[str, ...], Pattern]:
+        """Split header/footer patterns into literal prefixes and a fused regex
+        
+        Patterns of the form ^LITERAL or ^LITERAL[:：] over caseless characters
+        are checked with str.startswith; the rest are joined into one
+        case-insensitive alternation.
+        
+        Args:
+            patterns: Compiled header/footer patterns
+            
+        Returns:
+            Tuple of (literal prefixes, fused pattern for the remaining patterns)
+        """
+        prefixes = []
+        regex_patterns = []
+        for pattern in patterns:
+            body = pattern.pattern[1:] if pattern.pattern.startswith('^') else None
+            suffixes = ('',)
+            if body is not None and body.endswith('[:：]'):
+                body, suffixes = body[:-len('[:：]')], (':', '：')
+            if body and re.escape(body) == body and body.lower() == body.upper():
+                prefixes.extend(body + suffix for suffix in suffixes)
+            else:
+                regex_patterns.append(pattern.pattern)
+        
+        # An always-failing pattern keeps the per-line check branch-free
+        fused = re.compile('|'.join(f'(?:{pattern})' for pattern in regex_patterns) or r'(?!)', re.IGNORECASE)
+        return tuple(prefixes), fused
+    
+    def _is_header_footer(self, line: str) -> bool:
+        """Check whether a stripped line is a header or footer
+        
+        Args:
+            line: Stripped line
+            
+        Returns:
+            True if the line matches a header/footer pattern
+        """
+        return line.startswith(self._header_footer_prefixes) or self._header_footer_pattern.match(line) is not None
     
     def _init_medical_abbreviations(self) -> Dict[str, str]:
         """Initialize medical abbreviation mappings
@@ -132,6 +266,122 @@ class TextCleaner:
             '糖尿病': '糖尿病',
         }
     
+    def _compile_abbreviation_pattern(self, term_dict: Dict[str, str]) -> Tuple[Optional[Pattern], List[str]]:
+        """Compile all abbreviations into a single word-boundary alternation
+        
+        Each abbreviation gets its own capturing group so the replacement is
+        looked up by group index rather than by case-folding the match (which
+        would miss IGNORECASE matches such as 'ı' for 'I').
+        
+        Args:
+            term_dict: Abbreviation to full term mapping
+            
+        Returns:
+            Tuple of (compiled pattern or None if empty, full terms by group index)
+        """
+        # Longest first so that e.g. 'AMI' wins over 'MI' at the same position
+        abbrevs = sorted((abbrev for abbrev in term_dict if abbrev), key=len, reverse=True)
+        if not abbrevs:
+            return None, []
+        
+        alternation = '|'.join('(' + re.escape(abbrev) + ')' for abbrev in abbrevs)
+        pattern = re.compile(r'\b(?:' + alternation + r')\b', re.IGNORECASE)
+        # Group indices are 1-based; pad index 0
+        terms = [''] + [term_dict[abbrev] for abbrev in abbrevs]
+        return pattern, terms
+    
+    def _compile_structure_pattern(self) -> Pattern:
+        """Compile the line classifier used by extract_structured_content
+        
+        Titles, list items and references are fused into one alternation
+        whose named group gives the category. Title prefixes only count on
+        lines shorter than 100 characters, enforced by a lookahead that is
+        tried only when the line starts like a title.
+        
+        Returns:
+            Compiled pattern with 'title', 'list' and 'reference' groups
+        """
+        return re.compile(
+            r'(?P<title>(?=[一二三四五六七八九十\d])(?=.{0,99}\Z)'
+            r'(?:[一二三四五六七八九十]+[、．]|\d+[\.、]\s*[^0-9]))'
+            r'|(?P<list>[•·\-\*]\s+|\d+[\.）\)]\s+|[（\(]\d+[）\)]\s+)'
+            r'|(?P<reference>\[\d+\]|\d+\.\s+[A-Z])'
+        )
+    
+    @staticmethod
+    def _compile_single_abbreviation(abbrev: str) -> Pattern:
+        """Compile the word-boundary pattern for one abbreviation
+        
+        Args:
+            abbrev: Abbreviation
+            
+        Returns:
+            Compiled case-insensitive pattern
+        """
+        return re.compile(r'\b' + re.escape(abbrev) + r'\b', re.IGNORECASE)
+    
+    def _build_abbreviation_automaton(self, term_dict: Dict[str, str]):
+        """Build an Aho-Corasick automaton over the lower-cased abbreviations
+        
+        Keys are added in the same longest-first order as the regex
+        alternation, so when two keys fold to the same lower-case form the
+        one the regex would try first wins.
+        
+        Args:
+            term_dict: Abbreviation to full term mapping
+            
+        Returns:
+            Automaton with (key length, full term) values, or None if
+            pyahocorasick is unavailable or the dictionary is empty
+        """
+        if not AHOCORASICK_AVAILABLE:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for abbrev in sorted((abbrev for abbrev in term_dict if abbrev), key=len, reverse=True):
+            key = abbrev.lower().translate(_CASE_FOLD_EXTRAS)
+            if key not in automaton:
+                automaton.add_word(key, (len(key), term_dict[abbrev]))
+        if len(automaton) == 0:
+            return None
+        automaton.make_automaton()
+        return automaton
+    
+    @staticmethod
+    def _replace_with_automaton(text: str, folded_text: str, automaton) -> str:
+        """Replace abbreviations found by the automaton, mirroring the regex semantics
+        
+        Matches must sit on word boundaries; among overlapping matches the
+        leftmost wins, then the longest, and scanning resumes after it.
+        
+        Args:
+            text: Input text
+            folded_text: Case-folded text of the same length
+            automaton: Automaton from _build_abbreviation_automaton
+            
+        Returns:
+            Text with abbreviations replaced
+        """
+        spans = []
+        for last, (length, full_term) in automaton.iter(folded_text):
+            start, end = last - length + 1, last + 1
+            if _is_word_boundary(text, start) and _is_word_boundary(text, end):
+                spans.append((start, end, full_term))
+        if not spans:
+            return text
+        
+        spans.sort(key=lambda span: (span[0], span[0] - span[1]))
+        parts = []
+        position = 0
+        for start, end, full_term in spans:
+            if start < position:
+                continue
+            parts.append(text[position:start])
+            parts.append(full_term)
+            position = end
+        parts.append(text[position:])
+        return ''.join(parts)
+    
     def clean_basic(self, text: str) -> str:
         """Apply basic text cleaning
         
@@ -144,18 +394,14 @@ class TextCleaner:
         if not text or not text.strip():
             return ""
         
-        cleaned_text = text
+        # OCR errors: full-width numbers/letters to ASCII
+        cleaned_text = text.translate(_FULLWIDTH_TABLE)
         
         # Apply noise removal patterns
-        for pattern, replacement in self.noise_patterns:
-            if callable(replacement):
-                cleaned_text = re.sub(pattern, replacement, cleaned_text)
-            else:
-                cleaned_text = re.sub(pattern, replacement, cleaned_text)
+        cleaned_text = self._apply_noise_patterns(cleaned_text)
         
-        # Normalize whitespace
-        cleaned_text = re.sub(r'\s+', ' ', cleaned_text)
-        cleaned_text = cleaned_text.strip()
+        # Normalize whitespace (str.split() splits on exactly the characters \s matches)
+        cleaned_text = ' '.join(cleaned_text.split())
         
         return cleaned_text
     
@@ -172,33 +418,68 @@ class TextCleaner:
         if not text or not text.strip():
             return ""
         
-        lines = text.split('\n')
-        cleaned_lines = []
+        lines = [line for line in map(str.strip, text.split('\n')) if line]
         
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Check if line matches header/footer patterns
-            is_header_footer = False
-            for pattern in self.header_footer_patterns:
-                if re.match(pattern, line, re.IGNORECASE):
-                    is_header_footer = True
+        if logger.isEnabledFor(logging.DEBUG):
+            for line in lines:
+                if self._is_header_footer(line):
                     logger.debug(f"Removed header/footer: {line[:50]}...")
-                    break
+        
+        # Literal prefixes are checked first, then the fused regex
+        prefixes = self._header_footer_prefixes
+        match = self._header_footer_pattern.match
+        return '\n'.join([line for line in lines if not (line.startswith(prefixes) or match(line))])
+    
+    def _get_custom_term_matchers(self, custom_dict: Dict[str, str]) -> tuple:
+        """Get the matchers for the default dictionary merged with custom terms
+        
+        Batch runs usually pass the same custom dictionary for every document,
+        so merged matchers are cached (LRU, keyed by the dictionary items in
+        order) instead of being rebuilt per call.
+        
+        Args:
+            custom_dict: Custom terminology dictionary
             
-            if not is_header_footer:
-                cleaned_lines.append(line)
+        Returns:
+            Tuple of (automaton or None, pattern or None, terms by group index)
+        """
+        key = tuple(custom_dict.items())
+        with self._custom_term_lock:
+            matchers = self._custom_term_cache.get(key)
+            if matchers is not None:
+                self._custom_term_cache.move_to_end(key)
+                return matchers
         
-        return '\n'.join(cleaned_lines)
+        # Combine default and custom dictionaries
+        term_dict = self.medical_abbreviations.copy()
+        term_dict.update(custom_dict)
+        matchers = (self._build_abbreviation_automaton(term_dict),) + self._compile_abbreviation_pattern(term_dict)
+        
+        with self._custom_term_lock:
+            if key in self._custom_term_cache:
+                self._custom_term_cache.move_to_end(key)
+            elif len(self._custom_term_cache) >= CUSTOM_TERM_CACHE_SIZE:
+                self._custom_term_cache.popitem(last=False)
+            self._custom_term_cache[key] = matchers
+        return matchers
     
-    def normalize_medical_terms(self, text: str, custom_dict: Optional[Dict[str, str]] = None) -> str:
+    def normalize_medical_terms(self, text: str, custom_dict: Optional[Dict[str, str]] = None,
+                                sequential: bool = False) -> str:
         """Normalize medical terminology
         
+        All abbreviations (default and custom) are matched in a single pass
+        over the input, and replacement values are not scanned again. A
+        custom value that contains another abbreviation is therefore kept
+        as written: with custom_dict={"HTN": "CT 检查"}, "HTN" becomes
+        "CT 检查", not "计算机断层扫描 检查". Pass sequential=True to get the
+        old cascade, where each abbreviation is substituted in turn and a
+        later one can rewrite an earlier replacement.
+        
         Args:
             text: Input text
             custom_dict: Custom terminology dictionary
+            sequential: Replace one abbreviation after another in dictionary
+                order instead of in a single pass
             
         Returns:
             Text with normalized terminology
@@ -206,20 +487,50 @@ class TextCleaner:
         if not text or not text.strip():
             return ""
         
+        if sequential:
+            return self._normalize_terms_sequentially(text, custom_dict)
+        
+        if custom_dict:
+            automaton, pattern, terms = self._get_custom_term_matchers(custom_dict)
+        else:
+            automaton = self.abbreviation_automaton
+            pattern, terms = self.abbreviation_pattern, self.abbreviation_terms
+        
+        # Aho-Corasick needs a case-folded text with the same character offsets
+        if automaton is not None:
+            folded_text = text.lower().translate(_CASE_FOLD_EXTRAS)
+            if len(folded_text) == len(text):
+                return self._replace_with_automaton(text, folded_text, automaton)
+        
+        if pattern is None:
+            return text
+        
+        # Single pass: all abbreviations are replaced in parallel
+        return pattern.sub(lambda m: terms[m.lastindex], text)
+    
+    def _normalize_terms_sequentially(self, text: str, custom_dict: Optional[Dict[str, str]] = None) -> str:
+        """Apply one abbreviation substitution after another
+        
+        Args:
+            text: Input text
+            custom_dict: Custom terminology dictionary
+            
+        Returns:
+            Text with normalized terminology
+        """
         # Combine default and custom dictionaries
         term_dict = self.medical_abbreviations.copy()
         if custom_dict:
             term_dict.update(custom_dict)
         
-        normalized_text = text
-        
-        # Apply term normalization
         for abbrev, full_term in term_dict.items():
-            # Case-insensitive replacement with word boundaries
-            pattern = r'\b' + re.escape(abbrev) + r'\b'
-            normalized_text = re.sub(pattern, full_term, normalized_text, flags=re.IGNORECASE)
+            # Default abbreviations are precompiled; only custom ones are compiled here
+            pattern = self._abbreviation_patterns.get(abbrev)
+            if pattern is None:
+                pattern = self._compile_single_abbreviation(abbrev)
+            text = pattern.sub(full_term, text)
         
-        return normalized_text
+        return text
     
     def remove_redundant_content(self, text: str) -> str:
         """Remove redundant and repetitive content
@@ -234,23 +545,22 @@ class TextCleaner:
             return ""
         
         lines = text.split('\n')
+        # Normalize all lines for comparison at once (remove extra spaces, punctuation)
+        normalized_lines = self._non_word_pattern.sub('', text.lower()).split('\n')
         unique_lines = []
-        seen_lines = set()
+        # 8-byte digests instead of full lines keep the seen-set small on large documents
+        seen_hashes: Set[bytes] = set()
         
-        for line in lines:
-            line = line.strip()
-            if not line:
+        for line, normalized_line in zip(lines, normalized_lines):
+            # Skip empty or very short lines
+            if len(normalized_line) < 10:
                 continue
-            
-            # Normalize line for comparison (remove extra spaces, punctuation)
-            normalized_line = re.sub(r'[^\w\u4e00-\u9fff]', '', line.lower())
-            
-            # Skip very short lines or lines we've seen before
-            if len(normalized_line) < 10 or normalized_line in seen_lines:
+            line_hash = blake2b(normalized_line.encode('utf-8'), digest_size=8).digest()
+            if line_hash in seen_hashes:
                 continue
             
-            seen_lines.add(normalized_line)
-            unique_lines.append(line)
+            seen_hashes.add(line_hash)
+            unique_lines.append(line.strip())
         
         return '\n'.join(unique_lines)
     
@@ -287,13 +597,73 @@ class TextCleaner:
         # Step 4: Remove redundant content
         cleaned_text = self.remove_redundant_content(cleaned_text)
         
-        # Step 5: Final cleanup
-        cleaned_text = self.clean_basic(cleaned_text)
+        # Step 5: Final cleanup (noise was already removed in step 1; only
+        # whitespace needs normalizing again)
+        cleaned_text = ' '.join(cleaned_text.split())
         
         logger.debug(f"Comprehensive cleaning completed. Output length: {len(cleaned_text)}")
         
         return cleaned_text
     
+    def clean_batch(self, texts: List[str], custom_terms: Optional[Dict[str, str]] = None) -> List[str]:
+        """Apply the comprehensive cleaning pipeline to many texts at once
+        
+        Equivalent to calling clean_comprehensive on each text, but the
+        character translation, most noise passes and term normalization run
+        once over the joined texts instead of once per text.
+        
+        Args:
+            texts: Input texts
+            custom_terms: Custom terminology dictionary
+            
+        Returns:
+            Cleaned texts, in input order
+        """
+        if not texts:
+            return []
+        if any('\x1e' in text for text in texts):
+            # The separator cannot be told apart from the text
+            return [self.clean_comprehensive(text, None, custom_terms) for text in texts]
+        
+        # Step 1: Basic cleaning (every result is a single line)
+        cleaned_texts = self._clean_basic_batch(texts)
+        
+        # Step 2: Remove headers and footers
+        is_header_footer = self._is_header_footer
+        cleaned_texts = [text if text and not is_header_footer(text) else "" for text in cleaned_texts]
+        
+        # Step 3: Normalize medical terms, joined by newlines when the terms
+        # cannot span or introduce one
+        if any(cleaned_texts):
+            if custom_terms and any('\n' in key or '\n' in value for key, value in custom_terms.items()):
+                cleaned_texts = [self.normalize_medical_terms(text, custom_terms) for text in cleaned_texts]
+            else:
+                cleaned_texts = self.normalize_medical_terms('\n'.join(cleaned_texts), custom_terms).split('\n')
+        
+        # Steps 4-5: Redundancy removal is per document
+        return [' '.join(self.remove_redundant_content(text).split()) for text in cleaned_texts]
+    
+    def _clean_basic_batch(self, texts: List[str]) -> List[str]:
+        """Apply clean_basic to many texts using one joined buffer
+        
+        Args:
+            texts: Input texts (must not contain the batch separator)
+            
+        Returns:
+            Basically cleaned texts, in input order
+        """
+        joined = _BATCH_SEPARATOR.join(texts).translate(_FULLWIDTH_TABLE)
+        
+        for pattern, replacement, guard, text_scoped in self.noise_patterns:
+            if text_scoped:
+                joined = _BATCH_SEPARATOR.join(
+                    pattern.sub(replacement, part) for part in joined.split(_BATCH_SEPARATOR)
+                )
+            elif self._passes_noise_guard(guard, joined):
+                joined = pattern.sub(replacement, joined)
+        
+        return [' '.join(part.split()) for part in joined.split(_BATCH_SEPARATOR)]
+    
     def extract_structured_content(self, text: str) -> Dict[str, List[str]]:
         """Extract structured content from text
         
@@ -316,6 +686,7 @@ class TextCleaner:
         
         lines = text.split('\n')
         current_paragraph = []
+        classify = self._structure_pattern.match
         
         for line in lines:
             line = line.strip()
@@ -325,32 +696,25 @@ class TextCleaner:
                     current_paragraph = []
                 continue
             
-            # Detect titles (short lines, often capitalized or with specific patterns)
-            if (len(line) < 100 and 
-                (line.isupper() or 
-                 re.match(r'^[一二三四五六七八九十]+[、．]', line) or
-                 re.match(r'^\d+[\.、]\s*[^0-9]', line))):
-                structured_content["titles"].append(line)
-                if current_paragraph:
-                    structured_content["paragraphs"].append(' '.join(current_paragraph))
-                    current_paragraph = []
-                continue
+            # Classify the line with a single match; isupper/keyword checks are
+            # plain string tests
+            match = classify(line)
+            category = match.lastgroup if match else None
             
+            # Detect titles (short lines, often capitalized or with specific patterns)
+            if category == 'title' or (len(line) < 100 and line.isupper()):
+                category = 'titles'
             # Detect lists
-            if (re.match(r'^[•·\-\*]\s+', line) or 
-                re.match(r'^\d+[\.）\)]\s+', line) or
-                re.match(r'^[（\(]\d+[）\)]\s+', line)):
-                structured_content["lists"].append(line)
-                if current_paragraph:
-                    structured_content["paragraphs"].append(' '.join(current_paragraph))
-                    current_paragraph = []
-                continue
-            
+            elif category == 'list':
+                category = 'lists'
             # Detect references
-            if (re.match(r'^\[\d+\]', line) or 
-                re.match(r'^\d+\.\s+[A-Z]', line) or
-                '参考文献' in line):
-                structured_content["references"].append(line)
+            elif category == 'reference' or '参考文献' in line:
+                category = 'references'
+            else:
+                category = None
+            
+            if category:
+                structured_content[category].append(line)
                 if current_paragraph:
                     structured_content["paragraphs"].append(' '.join(current_paragraph))
                     current_paragraph = []
@@ -366,6 +730,13 @@ class TextCleaner:
         return structured_content
 
 
+def _is_word_boundary(text: str, index: int) -> bool:
+    """Equivalent of regex \\b at the given index of text"""
+    before = index > 0 and (text[index - 1].isalnum() or text[index - 1] == '_')
+    after = index < len(text) and (text[index].isalnum() or text[index] == '_')
+    return before != after
+
+
 # Global cleaner instance
 text_cleaner = TextCleaner()
 
@@ -382,9 +753,10 @@ def clean_comprehensive(text: str, page_number: Optional[int] = None,
     return text_cleaner.clean_comprehensive(text, page_number, custom_terms)
 
 
-def normalize_medical_terms(text: str, custom_dict: Optional[Dict[str, str]] = None) -> str:
-    """Normalize medical terminology"""
-    return text_cleaner.normalize_medical_terms(text, custom_dict)
+def normalize_medical_terms(text: str, custom_dict: Optional[Dict[str, str]] = None,
+                            sequential: bool = False) -> str:
+    """Normalize medical terminology in a single pass (sequential=True for the old cascade)"""
+    return text_cleaner.normalize_medical_terms(text, custom_dict, sequential)
 
 
 def remove_headers_footers(text: str, page_number: Optional[int] = None) -> str:
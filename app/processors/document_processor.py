@@ -3,14 +3,24 @@
 """
 
 from math import log
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import asyncio
+import gzip
+import hashlib
+import io
+import mmap
 import os
+import pickle
+import re
 import json
+import tarfile
 import uuid
 from .pdf_processor import PDFProcessor
 from .enhanced_pdf_processor import EnhancedPDFProcessor
-from .cleaners import TextCleaner
-from .medical_terminology import MedicalTerminologyStandardizer
+from .cleaners import text_cleaner
+from .medical_terminology import terminology_standardizer
 from .quality_filter import TextQualityFilter, ChunkMetadataEnhancer
 from app.utils.logger import setup_logger
 from app.storage.vector_store import get_vector_store_async
@@ -20,18 +30,186 @@ from datetime import datetime
 
 logger = setup_logger(__name__)
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 class ProcessingError(Exception):
     """文档处理异常"""
     pass
 
 
+# 批量处理支持的文件类型
+SUPPORTED_EXTENSIONS = ('.pdf', '.txt', '.docx', '.pptx', '.xlsx', '.md')
+
+# 不超过该大小的PDF一次性读入内存后解析，更大的文件按路径解析以控制内存
+PDF_IN_MEMORY_MAX_BYTES = 50 * 1024 * 1024
+
+# 超过该大小的TXT文件通过mmap直接解码，不再先读出一份完整的字节副本
+TXT_MMAP_MIN_BYTES = 4 * 1024 * 1024
+
+# 传统分块时用于寻找断点的句末标点
+SENTENCE_ENDINGS = '.!?。！？'
+
+# 批量处理默认进程数上限（每个子进程各自加载解析器和术语词典，内存随进程数增长）
+DEFAULT_MAX_WORKERS = 8
+
+# 结构化元素类型到结构标记的映射，未列出的类型不加标记
+STRUCTURE_TAGS = {
+    "title": "TITLE",
+    "heading": "TITLE",
+    "header": "HEADER",
+    "narrativetext": "HEADER",
+    "section": "SECTION",
+    "table": "TABLE",
+    "tabular": "TABLE",
+    "list": "LIST",
+    "listitem": "LIST",
+    "figure_caption": "FIGURE_CAPTION",
+    "footer": "FOOTER",
+}
+
+# unstructured元素类名（小写）包含的关键词到区段标记的映射，按顺序取第一个命中的规则，
+# 都未命中时标记为SECTION
+UNSTRUCTURED_SECTION_RULES = (
+    (("title", "header"), "TITLE"),
+    (("table",), "TABLE"),
+    (("list",), "LIST"),
+)
+
+# 按文件名关键词判断文档类型，按顺序取第一个命中的规则
+DOCUMENT_TYPE_RULES = (
+    (("report", "报告"), "medical_report"),
+    (("guideline", "指南"), "clinical_guideline"),
+    (("paper", "论文"), "research_paper"),
+)
+
+# 规则合并为一个正则：每条规则是从开头起的前瞻分支，分支顺序即规则优先级，
+# 命中的规则由lastgroup给出
+DOCUMENT_TYPE_PATTERN = re.compile(
+    '|'.join(
+        f"(?P<{document_type}>(?=.*?(?:{'|'.join(map(re.escape, keywords))})))"
+        for keywords, document_type in DOCUMENT_TYPE_RULES
+    ),
+    re.DOTALL
+)
+
+# 清洗/标准化阶段缓存在输出目录下的子目录名
+STAGE_CACHE_DIRNAME = ".stage_cache"
+
+# 压缩输出使用最快的gzip级别，写出耗时优先于压缩率
+OUTPUT_GZIP_LEVEL = 1
+
+# 并发写出处理结果文件的线程数
+OUTPUT_WRITE_WORKERS = 4
+
+# 进程池子进程内复用的文档处理器（每个子进程初始化一次）
+_worker_processor: Optional["DocumentProcessor"] = None
+
+
+def _init_worker(processor_kwargs: Dict[str, Any]):
+    """进程池子进程初始化：创建本进程的文档处理器"""
+    global _worker_processor
+    _worker_processor = DocumentProcessor(**processor_kwargs)
+
+
+def _process_one(file_path: str, keep_text: bool = False) -> Dict[str, Any]:
+    """进程池任务：解析、清洗单个文档并写出文本结果（顶层函数，可被pickle）
+    
+    Args:
+        file_path: 文档文件路径
+        keep_text: 是否在结果中保留全文
+        
+    Returns:
+        处理结果字典；keep_text为False时只包含轻量元数据
+    """
+    result = asyncio.run(_worker_processor.process_single_document(file_path))
+    output_path = _worker_processor._save_text_output(result, file_path)
+    if keep_text:
+        return result
+    
+    # 全文已写入磁盘，只回传轻量元数据，避免跨进程传输并在主进程累积全文
+    return {
+        "file_path": result["file_path"],
+        "document_id": result["document_id"],
+        "output_path": output_path,
+        "text_length": len(result["text"]),
+        "raw_text_length": len(result["raw_text"]),
+        "metadata": result["metadata"],
+    }
+
+
+@lru_cache(maxsize=None)
+def _unstructured_section_markers(element_class: type) -> Tuple[str, str]:
+    """unstructured元素类对应的区段起止标记（按元素类缓存，每个类只匹配一次规则）"""
+    element_type = element_class.__name__.lower()
+    section = next(
+        (name for keywords, name in UNSTRUCTURED_SECTION_RULES
+         if any(keyword in element_type for keyword in keywords)),
+        "SECTION"
+    )
+    return f"\n##{section}_START_\n", f"\n##{section}_END_\n"
+
+
+@lru_cache(maxsize=None)
+def _get_quality_filter() -> TextQualityFilter:
+    """本进程共享的质量过滤器（无状态，首次使用时创建）"""
+    return TextQualityFilter()
+
+
+@lru_cache(maxsize=None)
+def _get_metadata_enhancer() -> ChunkMetadataEnhancer:
+    """本进程共享的文本块元数据增强器（无状态，首次使用时创建）"""
+    return ChunkMetadataEnhancer()
+
+
+def _write_output(task: Tuple[str, Any, bool]):
+    """写出单个结果文件
+    
+    JSON以紧凑格式写出；路径以.gz结尾时按gzip压缩写出；
+    路径以.tar.gz结尾时内容为{成员文件名: 文本}，打包为单个压缩归档。
+    
+    Args:
+        task: (输出路径, 内容, 是否按JSON写出)
+    """
+    path, payload, is_json = task
+    if path.endswith('.tar.gz'):
+        with tarfile.open(path, 'w:gz', compresslevel=OUTPUT_GZIP_LEVEL) as tar:
+            for member_name, text in payload.items():
+                data = text.encode('utf-8')
+                info = tarfile.TarInfo(member_name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        return
+    
+    if is_json:
+        if ORJSON_AVAILABLE:
+            # orjson直接输出UTF-8字节，无需再次编码
+            data = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+        else:
+            data = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    else:
+        data = payload.encode('utf-8')
+    
+    if path.endswith('.gz'):
+        with gzip.open(path, 'wb', compresslevel=OUTPUT_GZIP_LEVEL) as f:
+            f.write(data)
+    else:
+        with open(path, 'wb') as f:
+            f.write(data)
+
+
 class DocumentProcessor:
     """处理文档集合的类"""
     
     def __init__(self, input_dir: str, output_dir: str, vector_store=None, use_enhanced_parser: bool = True, 
                  enable_cleaning: bool = True, enable_terminology_standardization: bool = True,
-                 enable_quality_filtering: bool = True, enable_async_metadata: bool = True):
+                 enable_quality_filtering: bool = True, enable_async_metadata: bool = True,
+                 legacy_outputs: bool = False, compress_outputs: bool = False,
+                 stage_cache: bool = False):
         """初始化文档处理器
         
         Args:
@@ -43,6 +221,12 @@ class DocumentProcessor:
             enable_terminology_standardization: 是否启用术语标准化
             enable_quality_filtering: 是否启用质量过滤
             enable_async_metadata: 是否启用异步元数据处理
+            legacy_outputs: 是否额外写出旧版的分版本文本和元数据文件（统一JSON已包含这些内容）
+            compress_outputs: 是否压缩写出结果：统一JSON写为<文件名>.json.gz，
+                旧版分版本文本打包为单个<基础名>_texts.tar.gz
+            stage_cache: 是否按原始文本的内容哈希缓存清洗和术语标准化的结果，重复处理相同内容时跳过这两步；
+                同时按PDF文件内容哈希缓存增强解析器的解析结果，未变化的PDF不再重新解析；
+                缓存不感知清洗规则、术语词典和解析器代码的变化，修改后需清空输出目录下的.stage_cache
         """
         self.input_dir = input_dir
         self.output_dir = output_dir
@@ -54,17 +238,28 @@ class DocumentProcessor:
         self.enable_terminology_standardization = enable_terminology_standardization
         self.enable_quality_filtering = enable_quality_filtering
         self.enable_async_metadata = enable_async_metadata
+        self.legacy_outputs = legacy_outputs
+        self.compress_outputs = compress_outputs
+        self.stage_cache = stage_cache
         
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Initialize processors
+        # 输出目录通常已存在，先尝试单次mkdir，父目录缺失时再逐级创建
+        try:
+            os.mkdir(output_dir)
+        except FileExistsError:
+            pass
+        except FileNotFoundError:
+            os.makedirs(output_dir, exist_ok=True)
+        
+        # Initialize processors: the pipeline objects only hold precompiled
+        # patterns and dictionaries, so one instance per process is shared by
+        # every DocumentProcessor (including the one built in each pool worker)
         if enable_cleaning:
-            self.text_cleaner = TextCleaner()
+            self.text_cleaner = text_cleaner
         if enable_terminology_standardization:
-            self.terminology_standardizer = MedicalTerminologyStandardizer()
+            self.terminology_standardizer = terminology_standardizer
         if enable_quality_filtering:
-            self.quality_filter = TextQualityFilter()
-            self.metadata_enhancer = ChunkMetadataEnhancer()
+            self.quality_filter = _get_quality_filter()
+            self.metadata_enhancer = _get_metadata_enhancer()
             
         # Celery is initialized globally, no need for queue setup
         if self.enable_async_metadata:
@@ -86,32 +281,40 @@ class DocumentProcessor:
             logger.info("数据库管理器初始化完成")
         return self.db_manager
         
-    async def process_single_document(self, file_path: str, document_id: Optional[str] = None) -> Dict[str, Any]:
+    async def process_single_document(self, file_path: str, document_id: Optional[str] = None,
+                                      keep_raw_text: bool = True) -> Dict[str, Any]:
         """处理单个文档
         
         Args:
             file_path: 文档文件路径
             document_id: 可选的文档ID，如果不提供则生成新的ID
+            keep_raw_text: 是否在结果中保留原始文本；只使用最终文本的调用方可关闭，
+                避免在后续耗时流程中继续持有一份全文
             
         Returns:
             处理结果字典，包含原始文本、清洗后文本、结构化信息等
         """
         try:
             # Step 1: 根据文件类型进行解析
-            file_extension = os.path.splitext(file_path)[1].lower()
+            # 文件名、扩展名和大小在入口处一次取得，各步骤不再重复split/stat
+            file_name = os.path.basename(file_path)
+            file_extension = os.path.splitext(file_name)[1].lower()
+            file_size = os.stat(file_path).st_size
             structured_elements = []  # 初始化structured_elements变量
+            structured_text_for_analysis = ""  # 字典形式结构化元素的原始内容，供结构分析使用
             
             if file_extension == '.txt':
                 # 处理TXT文件
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    raw_text = f.read()
+                raw_text = self._read_text_file(file_path, file_size)
                 structured_text = raw_text
-                metadata = {"file_type": "txt", "file_name": os.path.basename(file_path)}
+                metadata = {"file_type": "txt", "file_name": file_name}
                 
             elif file_extension == '.pdf':
-                # 处理PDF文件
+                # 处理PDF文件：小文件一次顺序读入内存，解析时不再反复打开和定位文件
+                pdf_bytes = self._read_pdf_bytes(file_path, file_size)
                 if self.use_enhanced_parser:
-                    processor = EnhancedPDFProcessor(file_path)
+                    pdf_cache_dir = os.path.join(self.output_dir, STAGE_CACHE_DIRNAME, "pdf") if self.stage_cache else None
+                    processor = EnhancedPDFProcessor(file_path, pdf_bytes=pdf_bytes, cache_dir=pdf_cache_dir)
                     result = processor.process()
                     
                     # Extract structured elements
@@ -120,11 +323,11 @@ class DocumentProcessor:
                     metadata = result.get("metadata", {})
                     
                     # Add structure markers
-                    structured_text = self._add_structure_markers(structured_elements)
+                    structured_text, structured_text_for_analysis = self._add_structure_markers(structured_elements)
                     
                 else:
                     # Fallback to original processor
-                    processor = PDFProcessor(file_path)
+                    processor = PDFProcessor(file_path, pdf_bytes=pdf_bytes)
                     result = processor.process()
                     raw_text = result.get("text", "")
                     structured_text = raw_text
@@ -156,7 +359,7 @@ class DocumentProcessor:
                     structured_text = raw_text
                     metadata = {
                         "file_type": file_extension.lstrip('.'),
-                        "file_name": os.path.basename(file_path),
+                        "file_name": file_name,
                         "processing_method": "fallback_text_extraction",
                         "warning": f"Unstructured处理失败: {str(unstructured_error)}"
                     }
@@ -164,50 +367,23 @@ class DocumentProcessor:
             else:
                 raise ValueError(f"Unsupported file type: {file_extension}")
             
-            # Step 2: Multi-stage text cleaning
-            cleaned_text = raw_text
-            logger.info(f"enable_cleaning: {self.enable_cleaning}")
-            if self.enable_cleaning:
-                cleaned_text = self.text_cleaner.clean_comprehensive(raw_text)
-                
-                # Extract structured content if available
-                if 'structured_elements' in locals() and structured_elements:
-                    # Check if elements are from unstructured (have .text attribute) or other formats (dict-like)
-                    if hasattr(structured_elements[0], 'text'):
-                        # Handle unstructured elements (already processed above)
-                        pass
-                    else:
-                        # Handle other structured elements (dict-like)
-                        structured_text_for_analysis = "\n".join([
-                            str(element.get("content", "")) for element in structured_elements 
-                            if isinstance(element, dict) and element.get("content")
-                        ])
-                        if structured_text_for_analysis:
-                            try:
-                                structured_content = self.text_cleaner.extract_structured_content(structured_text_for_analysis)
-                                # Safely merge structured content
-                                for key, value in structured_content.items():
-                                    if isinstance(value, (str, int, float, bool)):
-                                        metadata[key] = str(value)  # Convert all to string for consistency
-                                    elif isinstance(value, (list, dict)):
-                                        metadata[key] = str(value)  # Convert complex types to string
-                            except Exception as e:
-                                logger.warning(f"Failed to extract structured content: {e}")
-            
-            # Step 3: Medical terminology standardization
-            standardized_text = cleaned_text
-            if self.enable_terminology_standardization:
-                standardized_text = self.terminology_standardizer.standardize_text(cleaned_text)
-                
-                # Extract medical entities
-                entities = self.terminology_standardizer.extract_medical_entities(standardized_text)
-                if isinstance(entities, (list, dict)):
-                    metadata["medical_entities"] = str(entities)  # Convert to string for storage
-                else:
-                    metadata["medical_entities"] = entities
+            # Only dict-like elements carry raw content for structure analysis;
+            # unstructured elements (with .text) were already marked above
+            if not structured_elements or hasattr(structured_elements[0], 'text'):
+                structured_text_for_analysis = ""
+            
+            # Step 2-3: 清洗与术语标准化（开启stage_cache时相同内容直接复用上次结果）
+            cache_path = self._stage_cache_path(raw_text, structured_text_for_analysis) if self.stage_cache else None
+            stage_result = self._load_stage_cache(cache_path) if cache_path else None
+            if stage_result is None:
+                stage_result = self._clean_and_standardize(raw_text, structured_text_for_analysis)
+                if cache_path:
+                    self._save_stage_cache(cache_path, stage_result)
+            standardized_text, stage_metadata = stage_result
+            metadata.update(stage_metadata)
             
             # 增强元数据
-            enhanced_metadata = self._enhance_metadata(metadata, file_path)
+            enhanced_metadata = self._enhance_metadata(metadata, file_path, file_size)
             
             # 使用提供的文档ID或生成新的ID
             if document_id is None:
@@ -219,11 +395,11 @@ class DocumentProcessor:
                 "file_path": file_path,
                 "document_id": document_id,
                 "text": standardized_text, # 返回最干净的文本供后续处理
-                "raw_text": raw_text,
+                "raw_text": raw_text if keep_raw_text else None,
                 "metadata": enhanced_metadata
             }
             
-            logger.info(f"Successfully processed document {document_id}: {os.path.basename(file_path)}")
+            logger.info(f"Successfully processed document {document_id}: {file_name}")
             return final_result
             
         except Exception as e:
@@ -232,6 +408,185 @@ class DocumentProcessor:
             logger.error(f"Traceback: {traceback.format_exc()}")
             raise
     
+    def _clean_and_standardize(self, raw_text: str,
+                               structured_text_for_analysis: str) -> Tuple[str, Dict[str, Any]]:
+        """清洗和术语标准化阶段
+        
+        Args:
+            raw_text: 原始文本
+            structured_text_for_analysis: 字典形式结构化元素的原始内容，为空时不做结构分析
+            
+        Returns:
+            (标准化后的文本, 需要合并到文档元数据中的字段)
+        """
+        stage_metadata = {}
+        
+        # Step 2: Multi-stage text cleaning
+        cleaned_text = raw_text
+        logger.info(f"enable_cleaning: {self.enable_cleaning}")
+        if self.enable_cleaning:
+            cleaned_text = self.text_cleaner.clean_comprehensive(raw_text)
+            
+            # Extract structured content from dict-like elements, whose raw
+            # content was collected by _add_structure_markers
+            if structured_text_for_analysis:
+                try:
+                    structured_content = self.text_cleaner.extract_structured_content(structured_text_for_analysis)
+                    # Safely merge structured content
+                    for key, value in structured_content.items():
+                        if isinstance(value, (str, int, float, bool)):
+                            stage_metadata[key] = str(value)  # Convert all to string for consistency
+                        elif isinstance(value, (list, dict)):
+                            stage_metadata[key] = str(value)  # Convert complex types to string
+                except Exception as e:
+                    logger.warning(f"Failed to extract structured content: {e}")
+        
+        # Step 3: Medical terminology standardization
+        standardized_text = cleaned_text
+        if self.enable_terminology_standardization:
+            # Standardize and extract medical entities (one automaton scan of the result)
+            standardized_text, entities = self.terminology_standardizer.standardize_and_extract(cleaned_text)
+            if isinstance(entities, (list, dict)):
+                stage_metadata["medical_entities"] = str(entities)  # Convert to string for storage
+            else:
+                stage_metadata["medical_entities"] = entities
+        
+        return standardized_text, stage_metadata
+    
+    def _stage_cache_path(self, raw_text: str, structured_text_for_analysis: str) -> str:
+        """清洗/标准化阶段缓存文件路径，由阶段输入和开关的内容哈希决定"""
+        digest = hashlib.sha256()
+        digest.update(f"{int(self.enable_cleaning)}{int(self.enable_terminology_standardization)}".encode('ascii'))
+        for part in (raw_text, structured_text_for_analysis):
+            encoded = part.encode('utf-8', 'surrogatepass')
+            # 长度前缀保证两段内容的边界不会产生歧义
+            digest.update(len(encoded).to_bytes(8, 'little'))
+            digest.update(encoded)
+        return os.path.join(self.output_dir, STAGE_CACHE_DIRNAME, f"{digest.hexdigest()}.pkl")
+    
+    def _load_stage_cache(self, cache_path: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """读取阶段缓存，不存在或损坏时返回None"""
+        try:
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"读取阶段缓存失败，将重新处理: {cache_path}, 错误: {e}")
+            return None
+    
+    def _save_stage_cache(self, cache_path: str, stage_result: Tuple[str, Dict[str, Any]]):
+        """原子地写入阶段缓存（先写临时文件再替换），并发写同一内容时不会读到半个文件"""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(stage_result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"写入阶段缓存失败: {cache_path}, 错误: {e}")
+    
+    def process_all_documents(self, max_workers: Optional[int] = None,
+                              keep_text: bool = False) -> List[Dict[str, Any]]:
+        """并行处理输入目录中的全部文档
+        
+        解析和清洗是纯CPU计算且文档之间没有共享状态，因此使用进程池按文件并行处理。
+        单个文件处理失败时记录日志并跳过。该方法会阻塞直到全部文件处理完成。
+        处理后的文本写入输出目录，默认只返回轻量元数据，内存占用与文件数而非语料大小相关。
+        
+        Args:
+            max_workers: 进程数，默认取CPU核数与DEFAULT_MAX_WORKERS中的较小值
+            keep_text: 是否在返回结果中保留全文（raw_text/text）
+            
+        Returns:
+            处理结果列表（按文件名排序）
+        """
+        # scandir exposes the entry type without an extra stat per file on most platforms
+        with os.scandir(self.input_dir) as entries:
+            filenames = sorted(
+                entry.name for entry in entries
+                if entry.name.lower().endswith(SUPPORTED_EXTENSIONS) and entry.is_file()
+            )
+        if not filenames:
+            logger.info(f"输入目录中没有可处理的文档: {self.input_dir}")
+            return []
+        
+        # 子进程只负责解析和清洗，不连接向量库/数据库，也不触发异步元数据任务
+        processor_kwargs = {
+            "input_dir": self.input_dir,
+            "output_dir": self.output_dir,
+            "use_enhanced_parser": self.use_enhanced_parser,
+            "enable_cleaning": self.enable_cleaning,
+            "enable_terminology_standardization": self.enable_terminology_standardization,
+            "enable_quality_filtering": self.enable_quality_filtering,
+            "enable_async_metadata": False,
+            "stage_cache": self.stage_cache,
+        }
+        max_workers = max_workers or min(os.cpu_count() or 1, DEFAULT_MAX_WORKERS)
+        # 文件数少于进程数时不启动空闲进程
+        max_workers = min(max_workers, len(filenames))
+        logger.info(f"开始批量处理文档 - 文件数: {len(filenames)}, 进程数: {max_workers}")
+        
+        results_by_name = {}
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(processor_kwargs,)) as executor:
+            futures = {
+                executor.submit(_process_one, os.path.join(self.input_dir, filename), keep_text): filename
+                for filename in filenames
+            }
+            for future in as_completed(futures):
+                filename = futures[future]
+                try:
+                    results_by_name[filename] = future.result()
+                    logger.info(f"文档处理完成: {filename}")
+                except Exception as e:
+                    logger.error(f"文档处理失败，已跳过: {filename}, 错误: {e}")
+        
+        logger.info(f"批量处理完成 - 成功: {len(results_by_name)}/{len(filenames)}")
+        return [results_by_name[f] for f in filenames if f in results_by_name]
+    
+    def _read_text_file(self, file_path: str, file_size: Optional[int] = None) -> str:
+        """读取UTF-8文本文件
+        
+        大文件从mmap映射的页缓存直接解码，峰值内存只有解码后的字符串；
+        换行按文本模式的通用换行规则统一为LF，结果与open(..., 'r').read()一致。
+        
+        Args:
+            file_path: 文本文件路径
+            file_size: 已知的文件大小，未提供时读取文件状态
+            
+        Returns:
+            文件文本内容
+        """
+        if file_size is None:
+            file_size = os.path.getsize(file_path)
+        if file_size <= TXT_MMAP_MIN_BYTES:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = str(mm, 'utf-8')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+    
+    def _read_pdf_bytes(self, file_path: str, file_size: Optional[int] = None) -> Optional[bytes]:
+        """读取PDF文件内容用于内存解析
+        
+        Args:
+            file_path: PDF文件路径
+            file_size: 已知的文件大小，未提供时读取文件状态
+            
+        Returns:
+            文件内容；超过PDF_IN_MEMORY_MAX_BYTES时返回None，由解析器按路径读取
+        """
+        if file_size is None:
+            file_size = os.path.getsize(file_path)
+        if file_size > PDF_IN_MEMORY_MAX_BYTES:
+            return None
+        with open(file_path, 'rb') as f:
+            return f.read()
+    
     def _process_with_unstructured(self, file_path: str, file_extension: str):
         """使用unstructured处理多格式文档
         
@@ -354,21 +709,16 @@ class DocumentProcessor:
         structured_parts = []
         
         for element in elements:
-            if not hasattr(element, 'text') or not element.text or not element.text.strip():
+            text_content = getattr(element, 'text', None)
+            if not text_content:
+                continue
+            text_content = text_content.strip()
+            if not text_content:
                 continue
-                
-            element_type = type(element).__name__.lower()
-            text_content = element.text.strip()
             
             # 根据元素类型添加结构标记
-            if 'title' in element_type or 'header' in element_type:
-                structured_parts.append(f"\n##TITLE_START_\n{text_content}\n##TITLE_END_\n")
-            elif 'table' in element_type:
-                structured_parts.append(f"\n##TABLE_START_\n{text_content}\n##TABLE_END_\n")
-            elif 'list' in element_type:
-                structured_parts.append(f"\n##LIST_START_\n{text_content}\n##LIST_END_\n")
-            else:
-                structured_parts.append(f"\n##SECTION_START_\n{text_content}\n##SECTION_END_\n")
+            start_marker, end_marker = _unstructured_section_markers(type(element))
+            structured_parts.append(start_marker + text_content + end_marker)
         
         return "\n".join(structured_parts)
     
@@ -410,16 +760,20 @@ class DocumentProcessor:
             logger.error(f"回退文本提取失败: {e}")
             return f"[文档内容读取错误: {str(e)}]"
         
-    def _add_structure_markers(self, structured_elements) -> str:
+    def _add_structure_markers(self, structured_elements) -> Tuple[str, str]:
         """为结构化元素添加标记
         
+        同一次遍历中收集字典形式元素的原始内容，供结构分析使用，避免再次遍历元素列表。
+        
         Args:
             structured_elements: 结构化元素列表
             
         Returns:
-            带有结构标记的文本
+            (带有结构标记的文本, 字典形式元素的原始内容按行拼接的文本)
         """
         marked_text = []
+        raw_contents = []
+        get_tag = STRUCTURE_TAGS.get
         
         for element in structured_elements:
             # Check if element is from unstructured (has .text attribute) or dict-like
@@ -429,11 +783,19 @@ class DocumentProcessor:
                 content = getattr(element, 'text', '')
             else:
                 # Handle dict-like elements
-                element_type = element.get("type", "text") if isinstance(element, dict) else "text"
-                content = element.get("content", "") if isinstance(element, dict) else str(element)
+                if isinstance(element, dict):
+                    element_type = element.get("type", "text")
+                    content = element.get("content", "")
+                    if content:
+                        raw_contents.append(str(content))
+                else:
+                    element_type = "text"
+                    content = str(element)
             
             # Debug: Check if content is a list
-            if isinstance(content, list):
+            if isinstance(content, str):
+                text = content.strip()
+            elif isinstance(content, list):
                 logger.warning(f"Found list content in element type {element_type}: {content}")
                 text = " ".join(str(item) for item in content if item).strip()
             else:
@@ -443,55 +805,37 @@ class DocumentProcessor:
                 continue
                 
             # Add structure markers based on element type
-            if element_type in ["title", "heading"]:
-                marked_text.append(f"<TITLE>{text}</TITLE>")
-            elif element_type in ["header", "narrativetext"]:
-                marked_text.append(f"<HEADER>{text}</HEADER>")
-            elif element_type == "section":
-                marked_text.append(f"<SECTION>{text}</SECTION>")
-            elif element_type in ["table", "tabular"]:
-                marked_text.append(f"<TABLE>{text}</TABLE>")
-            elif element_type in ["list", "listitem"]:
-                marked_text.append(f"<LIST>{text}</LIST>")
-            elif element_type == "figure_caption":
-                marked_text.append(f"<FIGURE_CAPTION>{text}</FIGURE_CAPTION>")
-            elif element_type == "footer":
-                marked_text.append(f"<FOOTER>{text}</FOOTER>")
-            else:
-                marked_text.append(text)
+            tag = get_tag(element_type)
+            marked_text.append(f"<{tag}>{text}</{tag}>" if tag else text)
         
-        return "\n\n".join(marked_text)
+        return "\n\n".join(marked_text), "\n".join(raw_contents)
     
-    def _enhance_metadata(self, metadata: Dict[str, Any], file_path: str) -> Dict[str, Any]:
+    def _enhance_metadata(self, metadata: Dict[str, Any], file_path: str,
+                          file_size: Optional[int] = None) -> Dict[str, Any]:
         """增强文档元数据
         
         Args:
             metadata: 原始元数据
             file_path: 文件路径
+            file_size: 已知的文件大小，未提供时读取文件状态
             
         Returns:
             增强后的元数据
         """
         enhanced = metadata.copy()
+        base_name = os.path.basename(file_path)
         
         # Add file information
         enhanced.update({
-            "file_name": os.path.basename(file_path),
-            "file_size": os.path.getsize(file_path),
-            "processing_timestamp": __import__('datetime').datetime.now().isoformat(),
+            "file_name": base_name,
+            "file_size": file_size if file_size is not None else os.path.getsize(file_path),
+            "processing_timestamp": datetime.now().isoformat(),
             "processor_version": "2.0.0"
         })
         
         # Add document type classification
-        file_name = os.path.basename(file_path).lower()
-        if any(keyword in file_name for keyword in ["report", "报告"]):
-            enhanced["document_type"] = "medical_report"
-        elif any(keyword in file_name for keyword in ["guideline", "指南"]):
-            enhanced["document_type"] = "clinical_guideline"
-        elif any(keyword in file_name for keyword in ["paper", "论文"]):
-            enhanced["document_type"] = "research_paper"
-        else:
-            enhanced["document_type"] = "general_medical"
+        match = DOCUMENT_TYPE_PATTERN.match(base_name.lower())
+        enhanced["document_type"] = match.lastgroup if match else "general_medical"
         
         return enhanced
     
@@ -519,33 +863,63 @@ class DocumentProcessor:
         }
         
         # Save main JSON file (expected by validation tests)
-        main_output_path = os.path.join(self.output_dir, f"{filename}.json")
-        with open(main_output_path, 'w', encoding='utf-8') as f:
-            json.dump(unified_output, f, ensure_ascii=False, indent=2)
-        
-        # Save different versions of text (for backward compatibility)
-        text_outputs = {
-            "raw": result["raw_text"],
-            "cleaned": result["cleaned_text"],
-            "standardized": result["standardized_text"],
-            "structured": result["structured_text"]
-        }
+        main_output_name = f"{filename}.json.gz" if self.compress_outputs else f"{filename}.json"
+        tasks = [(os.path.join(self.output_dir, main_output_name), unified_output, True)]
+        
+        if self.legacy_outputs:
+            # Save different versions of text (for backward compatibility)
+            text_outputs = {
+                "raw": result["raw_text"],
+                "cleaned": result["cleaned_text"],
+                "standardized": result["standardized_text"],
+                "structured": result["structured_text"]
+            }
+            text_outputs = {
+                f"{base_name}_{version}.txt": text
+                for version, text in text_outputs.items()
+                if text  # Only save non-empty text
+            }
+            if self.compress_outputs:
+                # One archive per document instead of one file per text version
+                if text_outputs:
+                    tasks.append((os.path.join(self.output_dir, f"{base_name}_texts.tar.gz"), text_outputs, False))
+            else:
+                tasks.extend(
+                    (os.path.join(self.output_dir, txt_name), text, False)
+                    for txt_name, text in text_outputs.items()
+                )
+            
+            # Save metadata and processing stats as JSON (for backward compatibility)
+            tasks.append((os.path.join(self.output_dir, f"{base_name}_metadata.json"), result["metadata"], True))
+            tasks.append((os.path.join(self.output_dir, f"{base_name}_stats.json"), result["processing_stats"], True))
+        
+        if len(tasks) == 1:
+            _write_output(tasks[0])
+            return
         
-        for version, text in text_outputs.items():
-            if text:  # Only save non-empty text
-                output_path = os.path.join(self.output_dir, f"{base_name}_{version}.txt")
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(text)
-        
-        # Save metadata as JSON (for backward compatibility)
-        metadata_path = os.path.join(self.output_dir, f"{base_name}_metadata.json")
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(result["metadata"], f, ensure_ascii=False, indent=2)
-        
-        # Save processing stats (for backward compatibility)
-        stats_path = os.path.join(self.output_dir, f"{base_name}_stats.json")
-        with open(stats_path, 'w', encoding='utf-8') as f:
-            json.dump(result["processing_stats"], f, ensure_ascii=False, indent=2)
+        # Files are independent, so the writes overlap in a small thread pool
+        with ThreadPoolExecutor(max_workers=min(OUTPUT_WRITE_WORKERS, len(tasks))) as executor:
+            list(executor.map(_write_output, tasks))
+    
+    def _save_text_output(self, result: Dict[str, Any], file_path: str) -> str:
+        """将处理后的文本写入输出目录
+        
+        输出文件名保留原始扩展名（<文件名>.txt），与_save_processing_results的
+        <文件名>.json一致：同名不同类型的文档不会写到同一文件，输出目录与输入
+        目录相同时也不会覆盖源文件
+        
+        Args:
+            result: process_single_document返回的处理结果
+            file_path: 原始文件路径
+            
+        Returns:
+            输出文件路径
+        """
+        filename = os.path.basename(file_path)
+        output_path = os.path.join(self.output_dir, f"{filename}.txt")
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(result["text"])
+        return output_path
     
     def _split_into_chunks(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
         """将文本分割成块（传统单阶段分块）
@@ -561,6 +935,11 @@ class DocumentProcessor:
         if not text:
             return []
         
+        # Short documents fit in a single chunk, no break-point search needed
+        if len(text) <= chunk_size:
+            stripped = text.strip()
+            return [stripped] if stripped else []
+        
         chunks = []
         start = 0
         
@@ -569,17 +948,15 @@ class DocumentProcessor:
             
             # If this is not the last chunk, try to find a good break point
             if end < len(text):
-                # Look for sentence endings within the last 100 characters
+                # Look for sentence endings within the last 100 characters;
+                # rfind scans the window in C, once per terminator
                 search_start = max(start + chunk_size - 100, start)
-                sentence_endings = []
-                
-                for i in range(search_start, min(end + 50, len(text))):
-                    if text[i] in '.!?。！？':
-                        sentence_endings.append(i + 1)
+                search_end = min(end + 50, len(text))
+                last_ending = max(text.rfind(mark, search_start, search_end) for mark in SENTENCE_ENDINGS)
                 
                 # Use the last sentence ending if found
-                if sentence_endings:
-                    end = sentence_endings[-1]
+                if last_ending >= 0:
+                    end = last_ending + 1
             
             chunk = text[start:end].strip()
             if chunk:
@@ -3,9 +3,14 @@ Enhanced PDF Document Processor with Layout-Aware Parsing
 使用unstructured库实现布局感知的PDF文档处理器
 """
 
+import hashlib
+import io
 import os
+import pickle
 import re
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+import pypdf
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -18,26 +23,112 @@ except ImportError:
     logger.warning("unstructured library not available, falling back to basic PDF processing")
     UNSTRUCTURED_AVAILABLE = False
     # Fallback imports
-    import pypdf
     import pdfplumber
 
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    logger.info("pypdfium2 not available, extracting fallback page text with pypdf")
+    PDFIUM_AVAILABLE = False
+
+# Keywords (in lowercase) that classify Title and NarrativeText elements
+DOCUMENT_TITLE_KEYWORDS = ("指南", "共识", "标准", "规范", "建议")
+SECTION_TITLE_KEYWORDS = ("摘要", "abstract", "背景", "目的")
+AUTHOR_INFO_KEYWORDS = ("作者", "author", "通信", "corresponding")
+KEYWORD_LIST_KEYWORDS = ("关键词", "keywords", "key words")
+
+# Options passed to partition_pdf; together with the per-instance options
+# (see EnhancedPDFProcessor._partition_options) they are part of the parse cache key
+PARTITION_PDF_OPTIONS = {
+    "strategy": "fast",  # Fast strategy for better performance
+    "languages": ["chi_sim", "eng"],  # Support Chinese and English
+    "include_page_breaks": True,  # Preserve page structure
+    "extract_images_in_pdf": False,  # Skip images for now
+}
+
+# Bump when the shape of the cached process() result changes
+PARSE_CACHE_VERSION = 2
+
+# PDFs with fewer pages are always extracted in a single process
+PARALLEL_MIN_PAGES = 8
+
+# Bytes hashed per read when the PDF is not held in memory
+_HASH_READ_SIZE = 1024 * 1024
+
+_NUMBERED_LIST_RE = re.compile(r'^\d+[\.\)]\s+')
+_BULLET_LIST_RE = re.compile(r'^[•·\-\*]\s+')
+
+
+def _extract_page_range(pdf_path: str, pdf_bytes: bytes, page_offset: int,
+                        need_metadata: bool, processor_kwargs: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Process pool task: extract the elements of a PDF holding a page range
+    
+    Args:
+        pdf_path: Path of the original PDF
+        pdf_bytes: PDF containing only the pages of the range
+        page_offset: Number of pages before the range in the original PDF
+        need_metadata: Keep the full unstructured metadata of each element
+        processor_kwargs: Partition options of the original processor
+        
+    Returns:
+        Elements with page numbers of the original PDF
+    """
+    processor = EnhancedPDFProcessor(pdf_path, pdf_bytes=pdf_bytes, **processor_kwargs)
+    elements = processor.extract_structured_elements(need_metadata)
+    for element in elements:
+        if isinstance(element.get("page_number"), int):
+            element["page_number"] += page_offset
+        if isinstance(element.get("metadata", {}).get("page_number"), int):
+            element["metadata"]["page_number"] += page_offset
+    return elements
+
 
 class EnhancedPDFProcessor:
     """Enhanced PDF processor with layout-aware parsing capabilities"""
     
-    def __init__(self, pdf_path: str):
+    def __init__(self, pdf_path: str, pdf_bytes: Optional[bytes] = None,
+                 cache_dir: Optional[str] = None, chunk_by_title: bool = False,
+                 infer_table_structure: bool = True):
         """Initialize enhanced PDF processor
         
         Args:
             pdf_path: Path to PDF file
+            pdf_bytes: Optional PDF file content; when given the PDF is parsed
+                from memory instead of reopening the file
+            cache_dir: Optional directory caching process() results by the
+                content hash of the PDF, so unchanged files are not parsed again
+            chunk_by_title: Let unstructured group the elements into chunks by
+                title; off by default since the document is chunked downstream
+                and grouped chunks lose their title/narrative/list types
+            infer_table_structure: Let unstructured infer table structure
         """
         self.pdf_path = pdf_path
         self.filename = os.path.basename(pdf_path)
+        self.pdf_bytes = pdf_bytes
+        self.cache_dir = cache_dir
+        self.chunk_by_title = chunk_by_title
+        self.infer_table_structure = infer_table_structure
         self.use_unstructured = UNSTRUCTURED_AVAILABLE
+    
+    def _partition_options(self) -> Dict[str, Any]:
+        """Keyword arguments for partition_pdf besides the PDF source"""
+        options = dict(PARTITION_PDF_OPTIONS, infer_table_structure=self.infer_table_structure)
+        if self.chunk_by_title:
+            options["chunking_strategy"] = "by_title"  # Group content by titles
+        return options
+    
+    def _open_source(self):
+        """Return an in-memory stream of the PDF bytes, or the file path"""
+        return io.BytesIO(self.pdf_bytes) if self.pdf_bytes is not None else self.pdf_path
         
-    def extract_structured_elements(self) -> List[Dict[str, Any]]:
+    def extract_structured_elements(self, need_metadata: bool = True) -> List[Dict[str, Any]]:
         """Extract structured elements using unstructured library
         
+        Args:
+            need_metadata: Keep the full unstructured metadata of each element;
+                otherwise only its page number is kept
+        
         Returns:
             List of structured elements with type, content, and metadata
         """
@@ -50,49 +141,13 @@ class EnhancedPDFProcessor:
             
             # Use unstructured to partition PDF with layout awareness
             # Use fast strategy for better performance
-            elements = partition_pdf(
-                self.pdf_path,
-                strategy="fast",  # Fast strategy for better performance
-                infer_table_structure=True,  # Better table handling
-                languages=["chi_sim", "eng"],  # Support Chinese and English
-                include_page_breaks=True,  # Preserve page structure
-                extract_images_in_pdf=False,  # Skip images for now
-                chunking_strategy="by_title"  # Group content by titles
-            )
-            
-            processed_elements = []
-            current_page = 1
+            if self.pdf_bytes is not None:
+                source = {"file": self._open_source(), "metadata_filename": self.pdf_path}
+            else:
+                source = {"filename": self.pdf_path}
+            elements = partition_pdf(**source, **self._partition_options())
             
-            for element in elements:
-                element_type = element.__class__.__name__
-                content = element.text.strip() if element.text else ""
-                
-                if not content:
-                    continue
-                    
-                # Extract metadata
-                metadata = element.metadata.to_dict() if hasattr(element, 'metadata') else {}
-                page_number = metadata.get('page_number', current_page)
-                
-                # Classify element type for better processing
-                classified_type = self._classify_element_type(element_type, content)
-                
-                processed_element = {
-                    "type": classified_type,
-                    "original_type": element_type,
-                    "content": content,
-                    "page_number": page_number,
-                    "metadata": metadata,
-                    "length": len(content),
-                    "is_structured": True
-                }
-                
-                processed_elements.append(processed_element)
-                
-                # Update current page for elements without page info
-                if page_number > current_page:
-                    current_page = page_number
-                    
+            processed_elements = list(self._iter_structured_elements(elements, need_metadata))
             logger.info(f"Extracted {len(processed_elements)} structured elements")
             return processed_elements
             
@@ -101,6 +156,53 @@ class EnhancedPDFProcessor:
             logger.info("Falling back to basic PDF processing")
             return self._fallback_extraction()
     
+    def _iter_structured_elements(self, elements, need_metadata: bool = True) -> Iterator[Dict[str, Any]]:
+        """Convert unstructured elements to element dicts one at a time
+        
+        Args:
+            elements: Elements returned by partition_pdf
+            need_metadata: Build the full metadata dict of each element; it is
+                skipped by default in process() since only the page number is used
+            
+        Yields:
+            Element dicts with type, content, and metadata
+        """
+        current_page = 1
+        
+        for element in elements:
+            element_type = element.__class__.__name__
+            content = element.text.strip() if element.text else ""
+            
+            if not content:
+                continue
+                
+            # Extract metadata
+            if need_metadata:
+                metadata = element.metadata.to_dict() if hasattr(element, 'metadata') else {}
+                page_number = metadata.get('page_number', current_page)
+            else:
+                page_number = getattr(getattr(element, 'metadata', None), 'page_number', None)
+                if page_number is None:
+                    page_number = current_page
+                metadata = {"page_number": page_number}
+            
+            # Classify element type for better processing
+            classified_type = self._classify_element_type(element_type, content)
+            
+            yield {
+                "type": classified_type,
+                "original_type": element_type,
+                "content": content,
+                "page_number": page_number,
+                "metadata": metadata,
+                "length": len(content),
+                "is_structured": True
+            }
+            
+            # Update current page for elements without page info
+            if page_number > current_page:
+                current_page = page_number
+    
     def _classify_element_type(self, original_type: str, content: str) -> str:
         """Classify element type based on content analysis
         
@@ -111,13 +213,12 @@ class EnhancedPDFProcessor:
         Returns:
             Classified element type
         """
-        content_lower = content.lower().strip()
-        
         # Medical document specific classifications
         if original_type == "Title":
-            if any(keyword in content_lower for keyword in ["指南", "共识", "标准", "规范", "建议"]):
+            content_lower = content.lower()
+            if any(keyword in content_lower for keyword in DOCUMENT_TITLE_KEYWORDS):
                 return "document_title"
-            elif any(keyword in content_lower for keyword in ["摘要", "abstract", "背景", "目的"]):
+            elif any(keyword in content_lower for keyword in SECTION_TITLE_KEYWORDS):
                 return "section_title"
             else:
                 return "title"
@@ -125,17 +226,18 @@ class EnhancedPDFProcessor:
         elif original_type == "NarrativeText":
             if len(content) > 500:
                 return "main_content"
-            elif any(keyword in content_lower for keyword in ["作者", "author", "通信", "corresponding"]):
+            content_lower = content.lower()
+            if any(keyword in content_lower for keyword in AUTHOR_INFO_KEYWORDS):
                 return "author_info"
-            elif any(keyword in content_lower for keyword in ["关键词", "keywords", "key words"]):
+            elif any(keyword in content_lower for keyword in KEYWORD_LIST_KEYWORDS):
                 return "keywords"
             else:
                 return "narrative_text"
                 
         elif original_type == "ListItem":
-            if re.match(r'^\d+[\.\)]\s+', content):
+            if _NUMBERED_LIST_RE.match(content):
                 return "numbered_list"
-            elif re.match(r'^[•·\-\*]\s+', content):
+            elif _BULLET_LIST_RE.match(content):
                 return "bullet_list"
             else:
                 return "list_item"
@@ -161,26 +263,21 @@ class EnhancedPDFProcessor:
         try:
             elements = []
             
-            # Extract text using pypdf
-            with open(self.pdf_path, 'rb') as file:
-                reader = pypdf.PdfReader(file)
-                
-                for page_num, page in enumerate(reader.pages, 1):
-                    page_text = page.extract_text()
-                    if page_text and page_text.strip():
-                        elements.append({
-                            "type": "narrative_text",
-                            "original_type": "Text",
-                            "content": page_text.strip(),
-                            "page_number": page_num,
-                            "metadata": {"page_number": page_num},
-                            "length": len(page_text.strip()),
-                            "is_structured": False
-                        })
+            for page_num, page_text in enumerate(self._extract_page_texts(), 1):
+                if page_text and page_text.strip():
+                    elements.append({
+                        "type": "narrative_text",
+                        "original_type": "Text",
+                        "content": page_text.strip(),
+                        "page_number": page_num,
+                        "metadata": {"page_number": page_num},
+                        "length": len(page_text.strip()),
+                        "is_structured": False
+                    })
             
             # Extract tables using pdfplumber
             try:
-                with pdfplumber.open(self.pdf_path) as pdf:
+                with pdfplumber.open(self._open_source()) as pdf:
                     for page_num, page in enumerate(pdf.pages, 1):
                         tables = page.extract_tables()
                         for table_idx, table in enumerate(tables):
@@ -209,6 +306,31 @@ class EnhancedPDFProcessor:
             logger.error(f"Fallback extraction failed: {str(e)}")
             return []
     
+    def _extract_page_texts(self) -> Iterator[str]:
+        """Yield the text of each page, using pdfium when it is installed
+        
+        pdfium extracts text natively and is far faster than pypdf, which is
+        pure Python; it also decodes CJK fonts that pypdf often garbles.
+        """
+        if not PDFIUM_AVAILABLE:
+            reader = pypdf.PdfReader(self._open_source())
+            for page in reader.pages:
+                yield page.extract_text()
+            return
+        
+        pdf = pdfium.PdfDocument(self.pdf_bytes if self.pdf_bytes is not None else self.pdf_path)
+        try:
+            for page in pdf:
+                textpage = page.get_textpage()
+                try:
+                    # pdfium ends lines with CRLF
+                    yield textpage.get_text_range().replace("\r\n", "\n")
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+    
     def _format_table_text(self, table: List[List[str]], page_num: int, table_idx: int) -> str:
         """Format table data as text
         
@@ -220,11 +342,13 @@ class EnhancedPDFProcessor:
         Returns:
             Formatted table text
         """
-        table_text = f"表格内容(第{page_num}页，第{table_idx+1}个表格):\n"
-        for row in table:
-            if row:
-                table_text += " | ".join([str(cell) if cell else "" for cell in row]) + "\n"
-        return table_text
+        lines = [f"表格内容(第{page_num}页，第{table_idx+1}个表格):"]
+        lines.extend(
+            " | ".join([str(cell) if cell else "" for cell in row])
+            for row in table if row
+        )
+        lines.append("")  # Trailing newline
+        return "\n".join(lines)
     
     def extract_document_metadata(self, elements: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Extract document-level metadata from elements
@@ -235,47 +359,133 @@ class EnhancedPDFProcessor:
         Returns:
             Document metadata
         """
+        metadata, _ = self._summarize_elements(elements)
+        return metadata
+    
+    def _summarize_elements(self, elements: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], str]:
+        """Build the document metadata and the combined text in one pass
+        
+        Args:
+            elements: List of document elements
+            
+        Returns:
+            Tuple of (document metadata, element contents joined by blank lines)
+        """
+        parts = []
+        element_types = {}
+        total_pages = None
+        total_length = 0
+        has_tables = False
+        has_structured_content = False
+        title = None
+        
+        for element in elements:
+            content = element.get("content")
+            if content:
+                parts.append(content)
+            
+            page_number = element.get("page_number", 1)
+            if total_pages is None or page_number > total_pages:
+                total_pages = page_number
+            total_length += element.get("length", 0)
+            
+            element_type = element.get("type", "unknown")
+            element_types[element_type] = element_types.get(element_type, 0) + 1
+            if element_type == "table":
+                has_tables = True
+            elif title is None and element_type in ("document_title", "title"):
+                title = element["content"][:100]  # First 100 chars
+            if not has_structured_content and element.get("is_structured", False):
+                has_structured_content = True
+        
         metadata = {
             "filename": self.filename,
             "total_elements": len(elements),
-            "total_pages": max([el.get("page_number", 1) for el in elements]) if elements else 1,
-            "element_types": {},
-            "total_length": sum([el.get("length", 0) for el in elements]),
-            "has_tables": any(el.get("type") == "table" for el in elements),
-            "has_structured_content": any(el.get("is_structured", False) for el in elements)
+            "total_pages": total_pages if elements else 1,
+            "element_types": element_types,
+            "total_length": total_length,
+            "has_tables": has_tables,
+            "has_structured_content": has_structured_content,
+            # Title from the first title element
+            "title": title if title is not None else os.path.splitext(self.filename)[0],
         }
+        return metadata, "\n\n".join(parts)
+    
+    def _extract_elements_parallel(self, max_workers: int, need_metadata: bool) -> Optional[List[Dict[str, Any]]]:
+        """Extract elements of contiguous page ranges in a process pool
         
-        # Count element types
-        for element in elements:
-            element_type = element.get("type", "unknown")
-            metadata["element_types"][element_type] = metadata["element_types"].get(element_type, 0) + 1
+        Args:
+            max_workers: Number of worker processes and page ranges
+            need_metadata: Keep the full unstructured metadata of each element
+            
+        Returns:
+            Elements in the order of a single-process extraction, or None when
+            the PDF has fewer than PARALLEL_MIN_PAGES pages
+        """
+        reader = pypdf.PdfReader(self._open_source())
+        page_count = len(reader.pages)
+        if page_count < PARALLEL_MIN_PAGES:
+            return None
         
-        # Extract title from first title element
-        title_elements = [el for el in elements if el.get("type") in ["document_title", "title"]]
-        if title_elements:
-            metadata["title"] = title_elements[0]["content"][:100]  # First 100 chars
-        else:
-            metadata["title"] = os.path.splitext(self.filename)[0]
+        range_count = min(max_workers, page_count)
+        bounds = [page_count * i // range_count for i in range(range_count + 1)]
+        range_pdfs = []
+        for start, end in zip(bounds, bounds[1:]):
+            writer = pypdf.PdfWriter()
+            for page in reader.pages[start:end]:
+                writer.add_page(page)
+            buffer = io.BytesIO()
+            writer.write(buffer)
+            range_pdfs.append(buffer.getvalue())
         
-        return metadata
+        logger.info(f"Extracting {page_count} pages of {self.filename} in {range_count} processes")
+        processor_kwargs = {
+            "chunk_by_title": self.chunk_by_title,
+            "infer_table_structure": self.infer_table_structure,
+        }
+        with ProcessPoolExecutor(max_workers=range_count) as executor:
+            futures = [
+                executor.submit(_extract_page_range, self.pdf_path, range_pdf, start,
+                                need_metadata, processor_kwargs)
+                for range_pdf, start in zip(range_pdfs, bounds)
+            ]
+            elements = [element for future in futures for element in future.result()]
+        
+        if not self.use_unstructured:
+            # The fallback lists all page texts before all tables
+            elements.sort(key=lambda element: element["type"] == "table")
+        return elements
     
-    def process(self) -> Dict[str, Any]:
+    def process(self, need_metadata: bool = False, max_workers: Optional[int] = None) -> Dict[str, Any]:
         """Process PDF document and extract structured content
         
+        Args:
+            need_metadata: Keep the full unstructured metadata of each element
+            max_workers: When greater than 1, extract contiguous page ranges in
+                this many processes (PDFs of at least PARALLEL_MIN_PAGES pages)
+        
         Returns:
             Dictionary containing structured elements and metadata
         """
         logger.info(f"Starting enhanced PDF processing: {self.filename}")
         
+        cache_path = self._cache_path(need_metadata) if self.cache_dir else None
+        if cache_path:
+            cached = self._load_cache(cache_path)
+            if cached is not None:
+                logger.info(f"Enhanced PDF processing served from cache: {self.filename}")
+                return cached
+        
         try:
             # Extract structured elements
-            elements = self.extract_structured_elements()
-            
-            # Extract document metadata
-            metadata = self.extract_document_metadata(elements)
+            elements = None
+            if max_workers and max_workers > 1:
+                elements = self._extract_elements_parallel(max_workers, need_metadata)
+            if elements is None:
+                elements = self.extract_structured_elements(need_metadata=need_metadata)
             
-            # Combine all text content from elements
-            text_content = "\n\n".join([element.get("content", "") for element in elements if element.get("content")])
+            # Extract document metadata and combine all text content from elements
+            metadata, text_content = self._summarize_elements(elements)
             
             result = {
                 "filename": self.filename,
@@ -289,8 +499,47 @@ class EnhancedPDFProcessor:
             logger.info(f"Extracted {len(elements)} elements using {result['processing_method']} method")
             logger.info(f"Combined text length: {len(text_content)} characters")
             
+            # An empty result may come from a failed extraction; parse again next time
+            if cache_path and elements:
+                self._save_cache(cache_path, result)
             return result
             
         except Exception as e:
             logger.error(f"Enhanced PDF processing failed: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+    
+    def _cache_path(self, need_metadata: bool) -> str:
+        """Cache file of process() for this PDF content, file name and parse options"""
+        digest = hashlib.sha256()
+        key = (PARSE_CACHE_VERSION, self.use_unstructured, need_metadata, self.filename,
+               sorted(self._partition_options().items()))
+        digest.update(repr(key).encode('utf-8'))
+        if self.pdf_bytes is not None:
+            digest.update(self.pdf_bytes)
+        else:
+            with open(self.pdf_path, 'rb') as f:
+                for block in iter(lambda: f.read(_HASH_READ_SIZE), b''):
+                    digest.update(block)
+        return os.path.join(self.cache_dir, f"{digest.hexdigest()}.pkl")
+    
+    def _load_cache(self, cache_path: str) -> Optional[Dict[str, Any]]:
+        """Read a cached process() result; None when missing or unreadable"""
+        try:
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to read PDF parse cache {cache_path}: {e}")
+            return None
+    
+    def _save_cache(self, cache_path: str, result: Dict[str, Any]):
+        """Write a process() result atomically (temporary file, then replace)"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"Failed to write PDF parse cache {cache_path}: {e}")
@@ -5,12 +5,32 @@ Medical Terminology Standardization Module
 
 import re
 import json
+import string
 from typing import Dict, List, Set, Optional, Tuple
 from pathlib import Path
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    logger.info("pyahocorasick not available, extracting medical entities term by term")
+    AHOCORASICK_AVAILABLE = False
+
+# Characters that re.IGNORECASE matches to an ASCII letter although str.lower()
+# does not map them to it ('\u0130'.lower() is even two characters long)
+_IGNORECASE_ASCII_FOLDS = str.maketrans({'\u0130': 'i', '\u0131': 'i', '\u017f': 's'})
+_ASCII_LOWERCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Entity categories filled by dictionary values, and the dictionary providing them
+_ENTITY_VALUE_SOURCES = (
+    ("diseases", "disease_names"),
+    ("drugs", "drug_names"),
+    ("procedures", "procedure_names"),
+)
+
 
 class MedicalTerminologyStandardizer:
     """Medical terminology standardization and normalization"""
@@ -31,6 +51,10 @@ class MedicalTerminologyStandardizer:
         # Load custom dictionary if provided
         if custom_dict_path and Path(custom_dict_path).exists():
             self._load_custom_dictionary(custom_dict_path)
+        
+        self._build_standardization_index()
+        self.entity_automaton = self._build_entity_automaton()
+        self._build_variations_index()
     
     def _init_standard_terms(self) -> Dict[str, str]:
         """Initialize standard medical terms mapping
@@ -363,6 +387,9 @@ class MedicalTerminologyStandardizer:
             if 'procedure_names' in custom_dict:
                 self.procedure_names.update(custom_dict['procedure_names'])
             
+            self._build_standardization_index()
+            self.entity_automaton = self._build_entity_automaton()
+            self._build_variations_index()
             logger.info(f"Loaded custom terminology dictionary from {dict_path}")
             
         except Exception as e:
@@ -381,8 +408,34 @@ class MedicalTerminologyStandardizer:
             return ""
         
         standardized_text = text
+        if self.cjk_standardization_pattern is not None:
+            standard_forms = self._cjk_standard_forms
+            standardized_text = self.cjk_standardization_pattern.sub(
+                lambda match: standard_forms[_ascii_lower(match.group())], standardized_text
+            )
+        
+        rules = self.standardization_rules
+        if self.standardization_automaton is not None:
+            # Skip the rules whose term cannot occur in this text
+            rules = [rules[index] for index in sorted(self._candidate_rule_indices(standardized_text))]
+        
+        for pattern, standard in rules:
+            standardized_text = pattern.sub(standard, standardized_text)
+        
+        return standardized_text
+    
+    def _build_standardization_index(self):
+        """Precompile the standardization rules and index their terms
         
-        # Apply all standardization mappings
+        Terms containing non-ASCII characters go into a single alternation (see
+        _build_cjk_standardization). For the ASCII terms standardize_text
+        applies one word-bounded, case-insensitive substitution
+        per term, longest term first. Most terms never occur in a given text, so
+        an Aho-Corasick automaton over the case-folded terms finds in one scan
+        the rules that can match. A replacement may create an occurrence of a
+        later term (inside the inserted value or across its edges), so every
+        rule also records the later rules its replacement can bring into play.
+        """
         all_mappings = {}
         all_mappings.update(self.standard_terms)
         all_mappings.update(self.abbreviations)
@@ -392,13 +445,183 @@ class MedicalTerminologyStandardizer:
         
         # Sort by length (longest first) to avoid partial replacements
         sorted_terms = sorted(all_mappings.items(), key=lambda x: len(x[0]), reverse=True)
+        self._build_cjk_standardization([item for item in sorted_terms if not item[0].isascii()])
+        sorted_terms = [item for item in sorted_terms if item[0].isascii()]
         
-        for original, standard in sorted_terms:
-            # Use word boundaries for exact matching
-            pattern = r'\b' + re.escape(original) + r'\b'
-            standardized_text = re.sub(pattern, standard, standardized_text, flags=re.IGNORECASE)
+        # Use word boundaries for exact matching
+        self.standardization_rules = [
+            (re.compile(r'\b' + re.escape(original) + r'\b', re.IGNORECASE), standard)
+            for original, standard in sorted_terms
+        ]
+        self.standardization_automaton = None
+        if not AHOCORASICK_AVAILABLE:
+            return
         
-        return standardized_text
+        folded_terms = [_fold_case(original) for original, _ in sorted_terms]
+        # Empty terms match at every word boundary and are always applied
+        self._always_rule_indices = frozenset(
+            index for index, (original, _) in enumerate(sorted_terms) if not original
+        )
+        
+        term_rules: Dict[str, List[int]] = {}
+        heads: Dict[str, Set[int]] = {}
+        tails: Dict[str, Set[int]] = {}
+        for index, folded in enumerate(folded_terms):
+            if index in self._always_rule_indices:
+                continue
+            term_rules.setdefault(folded, []).append(index)
+            for size in range(1, len(folded) + 1):
+                heads.setdefault(folded[:size], set()).add(index)
+                tails.setdefault(folded[-size:], set()).add(index)
+        
+        automaton = ahocorasick.Automaton()
+        for folded, indices in term_rules.items():
+            automaton.add_word(folded, tuple(indices))
+        automaton.make_automaton()
+        
+        # Rules whose inserted value may complete an occurrence of another term;
+        # None when the value cannot be analysed (empty, or a template with escapes)
+        introduces: List[Optional[Set[int]]] = []
+        value_rules: Dict[str, List[int]] = {}
+        for index, (_, standard) in enumerate(sorted_terms):
+            if not standard or '\\' in standard:
+                introduces.append(None)
+                continue
+            folded = _fold_case(standard)
+            introduced = set()
+            # Terms inside the value
+            for _, indices in automaton.iter(folded):
+                introduced.update(indices)
+            # Terms crossing the right or left edge of the value
+            for size in range(1, len(folded) + 1):
+                introduced.update(heads.get(folded[-size:], ()))
+                introduced.update(tails.get(folded[:size], ()))
+            introduces.append(introduced)
+            value_rules.setdefault(folded, []).append(index)
+        
+        # Terms containing a whole value
+        if value_rules:
+            value_automaton = ahocorasick.Automaton()
+            for folded, indices in value_rules.items():
+                value_automaton.add_word(folded, tuple(indices))
+            value_automaton.make_automaton()
+            for term_index, folded in enumerate(folded_terms):
+                if term_index in self._always_rule_indices or not folded:
+                    continue
+                for _, indices in value_automaton.iter(folded):
+                    for index in indices:
+                        introduces[index].add(term_index)
+        
+        # Only later rules are affected by a replacement
+        self._rule_introduces = [
+            None if introduced is None else frozenset(i for i in introduced if i > index)
+            for index, introduced in enumerate(introduces)
+        ]
+        self.standardization_automaton = automaton
+    
+    def _build_cjk_standardization(self, cjk_terms: List[Tuple[str, str]]):
+        """Compile the terms containing non-ASCII characters into one alternation
+        
+        Chinese characters are word characters to re, so a \\b-bounded term
+        inside Chinese prose never matched. These terms are replaced in a single
+        leftmost, longest-first pass without word boundaries instead. Their
+        standard forms are matched as well and kept as they are, so a term that
+        is part of a standard form (左心衰 in 左心衰竭) does not rewrite it. An
+        edge that is an ASCII word character must still not touch another one.
+        
+        Args:
+            cjk_terms: (term, standard) pairs, longest term first
+        """
+        standard_forms = {
+            standard: standard for _, standard in cjk_terms if not standard.isascii()
+        }
+        standard_forms.update(cjk_terms)
+        terms = sorted(standard_forms, key=len, reverse=True)
+        
+        # ASCII letters become character classes rather than using IGNORECASE,
+        # and every alternative starts with its first character (no group, the
+        # left edge check comes after it), so that sre can skip most positions
+        # and alternatives on that character alone
+        alternatives = []
+        for term in terms:
+            chars = [
+                f'[{char.upper()}{char.lower()}]' if char.isascii() and char.isalpha() else re.escape(char)
+                for char in term
+            ]
+            if _is_ascii_word_char(term[0]):
+                chars.insert(1, f'(?<![A-Za-z0-9_]{chars[0]})')
+            if _is_ascii_word_char(term[-1]):
+                chars.append(r'(?![A-Za-z0-9_])')
+            alternatives.append(''.join(chars))
+        
+        self.cjk_standardization_pattern = re.compile('|'.join(alternatives)) if alternatives else None
+        # Keyed by the ASCII-lowercased term; the first of several spellings wins
+        self._cjk_standard_forms = {}
+        for term in terms:
+            self._cjk_standard_forms.setdefault(_ascii_lower(term), standard_forms[term])
+    
+    def _candidate_rule_indices(self, text: str) -> Set[int]:
+        """Indices of the standardization rules that can match in text
+        
+        Args:
+            text: Non-empty input text
+            
+        Returns:
+            Superset of the rules whose substitution changes the text
+        """
+        candidates = set(self._always_rule_indices)
+        for _, indices in self.standardization_automaton.iter(_fold_case(text)):
+            candidates.update(indices)
+        
+        pending = list(candidates)
+        while pending:
+            introduced = self._rule_introduces[pending.pop()]
+            if introduced is None:
+                return set(range(len(self.standardization_rules)))
+            new_rules = introduced - candidates
+            candidates |= new_rules
+            pending.extend(new_rules)
+        return candidates
+    
+    def _build_entity_automaton(self):
+        """Build an Aho-Corasick automaton over every entity term
+        
+        Each term maps to the categories it belongs to, so one scan of the
+        text finds the diseases, drugs, procedures and abbreviations together.
+        
+        Returns:
+            Automaton of term -> (term, categories), or None if pyahocorasick
+            is not installed
+        """
+        if not AHOCORASICK_AVAILABLE:
+            return None
+        
+        term_categories: Dict[str, List[str]] = {}
+        for category, source in _ENTITY_VALUE_SOURCES:
+            for term in getattr(self, source).values():
+                if term:
+                    term_categories.setdefault(term, []).append(category)
+        for abbrev in self.abbreviations:
+            if abbrev:
+                term_categories.setdefault(abbrev, []).append("abbreviations")
+        
+        automaton = ahocorasick.Automaton()
+        for term, categories in term_categories.items():
+            automaton.add_word(term, (term, tuple(categories)))
+        automaton.make_automaton()
+        return automaton
+    
+    def standardize_and_extract(self, text: str) -> Tuple[str, Dict[str, List[str]]]:
+        """Standardize terminology and extract medical entities from the result
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            Tuple of (standardized text, categorized medical entities)
+        """
+        standardized_text = self.standardize_text(text)
+        return standardized_text, self.extract_medical_entities(standardized_text)
     
     def extract_medical_entities(self, text: str) -> Dict[str, List[str]]:
         """Extract medical entities from text
@@ -412,6 +635,9 @@ class MedicalTerminologyStandardizer:
         if not text or not text.strip():
             return {}
         
+        if self.entity_automaton is not None:
+            return self._extract_entities_with_automaton(text)
+        
         entities = {
             "diseases": [],
             "drugs": [],
@@ -446,6 +672,36 @@ class MedicalTerminologyStandardizer:
         
         return entities
     
+    def _extract_entities_with_automaton(self, text: str) -> Dict[str, List[str]]:
+        """Single-pass equivalent of the per-term scans in extract_medical_entities
+        
+        Args:
+            text: Non-empty input text
+            
+        Returns:
+            Dictionary with categorized medical entities
+        """
+        found: Dict[str, Set[str]] = {
+            "diseases": set(),
+            "drugs": set(),
+            "procedures": set(),
+            "abbreviations": set(),
+            "symptoms": set()
+        }
+        
+        for end, (term, categories) in self.entity_automaton.iter(text):
+            for category in categories:
+                if term in found[category]:
+                    continue
+                if category == "abbreviations":
+                    # Abbreviations must match as whole words (regex \b on both sides)
+                    start = end - len(term) + 1
+                    if not (_is_word_boundary(text, start) and _is_word_boundary(text, end + 1)):
+                        continue
+                found[category].add(term)
+        
+        return {category: list(terms) for category, terms in found.items()}
+    
     def get_term_variations(self, standard_term: str) -> List[str]:
         """Get all variations of a standard term
         
@@ -455,20 +711,24 @@ class MedicalTerminologyStandardizer:
         Returns:
             List of term variations
         """
-        variations = [standard_term]
+        variations = {standard_term}
         
         # Check synonyms
-        if standard_term in self.synonyms:
-            variations.extend(self.synonyms[standard_term])
+        variations.update(self.synonyms.get(standard_term, ()))
         
         # Check reverse mappings
-        for mapping_dict in [self.standard_terms, self.abbreviations, 
-                           self.drug_names, self.disease_names, self.procedure_names]:
-            for original, standard in mapping_dict.items():
-                if standard == standard_term:
-                    variations.append(original)
+        variations.update(self._variations_index.get(standard_term, ()))
         
-        return list(set(variations))
+        return list(variations)
+    
+    def _build_variations_index(self):
+        """Index the original terms of every mapping by their standard term"""
+        index: Dict[str, List[str]] = {}
+        for mapping_dict in [self.standard_terms, self.abbreviations,
+                             self.drug_names, self.disease_names, self.procedure_names]:
+            for original, standard in mapping_dict.items():
+                index.setdefault(standard, []).append(original)
+        self._variations_index = index
     
     def validate_terminology(self, text: str) -> Dict[str, List[str]]:
         """Validate terminology usage in text
@@ -501,6 +761,29 @@ class MedicalTerminologyStandardizer:
         return validation_results
 
 
+def _fold_case(text: str) -> str:
+    """Fold case so that every re.IGNORECASE match of an ASCII or uncased term
+    is also a plain substring match of the folded term"""
+    return text.translate(_IGNORECASE_ASCII_FOLDS).lower()
+
+
+def _ascii_lower(text: str) -> str:
+    """Lowercase only the ASCII letters of text"""
+    return text.translate(_ASCII_LOWERCASE)
+
+
+def _is_ascii_word_char(char: str) -> bool:
+    """Whether char is an ASCII letter, digit or underscore"""
+    return char.isascii() and (char.isalnum() or char == '_')
+
+
+def _is_word_boundary(text: str, index: int) -> bool:
+    """Equivalent of regex \\b at the given index of text"""
+    before = index > 0 and (text[index - 1].isalnum() or text[index - 1] == '_')
+    after = index < len(text) and (text[index].isalnum() or text[index] == '_')
+    return before != after
+
+
 # Global terminology standardizer instance
 terminology_standardizer = MedicalTerminologyStandardizer()
 
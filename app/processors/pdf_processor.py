@@ -2,6 +2,7 @@
 PDF文档处理器
 """
 
+import io
 import os
 import pypdf
 from typing import List, Dict, Any, Optional
@@ -15,14 +16,20 @@ logger = setup_logger(__name__)
 class PDFProcessor:
     """处理医疗PDF文档的类，提取文本、表格和参考文献"""
     
-    def __init__(self, pdf_path: str):
+    def __init__(self, pdf_path: str, pdf_bytes: Optional[bytes] = None):
         """初始化PDF处理器
         
         Args:
             pdf_path: PDF文件路径
+            pdf_bytes: 可选的PDF文件内容，提供时从内存解析而不再打开文件
         """
         self.pdf_path = pdf_path
         self.filename = os.path.basename(pdf_path)
+        self.pdf_bytes = pdf_bytes
+    
+    def _open_source(self):
+        """返回解析库可打开的数据源：内存中的字节流或文件路径"""
+        return io.BytesIO(self.pdf_bytes) if self.pdf_bytes is not None else self.pdf_path
         
     def extract_text(self) -> str:
         """提取PDF中的所有文本内容
@@ -32,12 +39,11 @@ class PDFProcessor:
         """
         text = ""
         try:
-            with open(self.pdf_path, 'rb') as file:
-                reader = pypdf.PdfReader(file)
-                for page in reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n\n"
+            reader = pypdf.PdfReader(self._open_source())
+            for page in reader.pages:
+                page_text = page.extract_text()
+                if page_text:
+                    text += page_text + "\n\n"
             logger.info(f"成功提取文本，共 {len(text)} 个字符")
             return text
         except Exception as e:
@@ -52,7 +58,7 @@ class PDFProcessor:
         """
         tables = []
         try:
-            with pdfplumber.open(self.pdf_path) as pdf:
+            with pdfplumber.open(self._open_source()) as pdf:
                 for i, page in enumerate(pdf.pages):
                     page_tables = page.extract_tables()
                     if page_tables:
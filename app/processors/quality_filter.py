@@ -7,6 +7,7 @@ import re
 import math
 from typing import List, Dict, Any, Tuple
 from collections import Counter
+from itertools import repeat
 import logging
 
 logger = logging.getLogger(__name__)
@@ -66,7 +67,7 @@ class TextQualityFilter:
             过滤后的文本块和元数据列表
         """
         if metadata_list is None:
-            metadata_list = [{}] * len(text_chunks)
+            metadata_list = repeat({})
         
         filtered_chunks = []
         filtered_metadata = []
@@ -74,18 +75,16 @@ class TextQualityFilter:
         for i, (chunk, metadata) in enumerate(zip(text_chunks, metadata_list)):
             quality_score, quality_info = self.assess_text_quality(chunk)
             
-            # Add quality information to metadata
-            enhanced_metadata = metadata.copy()
-            enhanced_metadata.update({
-                'quality_score': quality_score,
-                'quality_info': quality_info,
-                'chunk_index': i
-            })
-            
-            # Filter based on quality criteria
+            # Filter based on quality criteria; metadata is only copied for kept chunks
             if self._passes_quality_filter(quality_info):
                 filtered_chunks.append(chunk)
-                filtered_metadata.append(enhanced_metadata)
+                # Add quality information to metadata
+                filtered_metadata.append({
+                    **metadata,
+                    'quality_score': quality_score,
+                    'quality_info': quality_info,
+                    'chunk_index': i
+                })
             else:
                 logger.debug(f"Filtered out chunk {i}: {quality_info}")
         
@@ -6,6 +6,7 @@ import os
 import uuid
 import asyncio
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 from datetime import datetime
@@ -21,6 +22,9 @@ from app.core.redis_client import get_redis_client
 
 logger = setup_logger(__name__)
 
+# 进度消息由单个后台线程按提交顺序发布，Redis往返（及首次连接）不阻塞事件循环
+_progress_publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="progress-publisher")
+
 
 class DocumentService:
     """文档服务类，处理文档相关的业务逻辑"""
@@ -98,18 +102,25 @@ class DocumentService:
         - connected: SSE连接建立
         - heartbeat: 心跳信号
         - timeout: 超时
+        
+        消息在调用时生成时间戳，交给后台线程发布，调用方不等待Redis响应。
         """
+        channel = f"document_progress_{document_id}"
+        progress_data = {
+            "document_id": document_id,
+            "status": status,
+            "progress": progress,
+            "message": message,
+            "timestamp": datetime.now().isoformat()
+        }
+        _progress_publisher.submit(self._send_progress, channel, progress_data)
+    
+    def _send_progress(self, channel: str, progress_data: Dict[str, Any]):
+        """在发布线程中把进度消息写入Redis"""
+        document_id = progress_data["document_id"]
         try:
-            channel = f"document_progress_{document_id}"
-            progress_data = {
-                "document_id": document_id,
-                "status": status,
-                "progress": progress,
-                "message": message,
-                "timestamp": datetime.now().isoformat()
-            }
             self.redis_client.publish(channel, progress_data)
-            logger.debug(f"Progress published for {document_id}: {status} ({progress}%)")
+            logger.debug(f"Progress published for {document_id}: {progress_data['status']} ({progress_data['progress']}%)")
         except Exception as e:
             logger.error(f"Failed to publish progress for {document_id}: {e}")
     
@@ -230,7 +241,10 @@ class DocumentService:
 
             # 2. 解析文档内容
             try:
-                extracted_data = await self.document_processor.process_single_document(document.file_path, document.id) 
+                # 后续只使用最终文本，不保留原始文本，降低小-大处理期间的内存占用
+                extracted_data = await self.document_processor.process_single_document(
+                    document.file_path, document.id, keep_raw_text=False
+                )
             except Exception as e:
                 logger.warning(f"EnhancedPDFProcessor失败: {e}, 回退到MultiFormatProcessor...")
                 extracted_data = await self.multi_format_processor.process_document_async(document.file_path)
@@ -346,8 +346,11 @@ class MultiFormatProcessor:
             elif 'slide_number' in element_metadata:
                 page_number = element_metadata['slide_number']
             
-            # Create chunk
-            chunk = DocumentChunk(
+            # Create chunk (fields come from the parser, skip validation).
+            # model_construct also bypasses the embedding pre-validator: pass
+            # an embedding here and it stays a list instead of float32 bytes,
+            # so build chunks that carry embeddings with DocumentChunk(...)
+            chunk = DocumentChunk.model_construct(
                 document_id=document_id,
                 chunk_index=chunk_index,
                 content=element.text.strip(),
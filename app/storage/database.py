@@ -678,6 +678,39 @@ class DatabaseManager(metaclass=SingletonMeta):
             logger.error(f"保存大块数据失败: {e}")
             return False
     
+    def save_parent_chunks(self, parent_chunks_data: List[Dict[str, Any]]) -> bool:
+        """批量保存大块数据
+        
+        所有大块通过同一连接的executemany一次写入，避免逐块建连和往返
+        
+        Args:
+            parent_chunks_data: 大块数据列表，每项包含id, document_id, content, summary, keywords
+            
+        Returns:
+            保存是否成功
+        """
+        if not parent_chunks_data:
+            return True
+            
+        try:
+            with self._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.executemany("""
+                        INSERT INTO parent_chunks (id, document_id, content, summary, keywords)
+                        VALUES (%(id)s, %(document_id)s, %(content)s, %(summary)s, %(keywords)s)
+                        ON DUPLICATE KEY UPDATE
+                        content = VALUES(content),
+                        summary = VALUES(summary),
+                        keywords = VALUES(keywords)
+                    """, parent_chunks_data)
+                    
+            logger.info(f"批量保存大块数据成功: {len(parent_chunks_data)} 个")
+            return True
+            
+        except Exception as e:
+            logger.error(f"批量保存大块数据失败: {e}")
+            return False
+    
     def get_parent_chunks_by_ids(self, parent_chunk_ids: List[str]) -> List[Dict[str, Any]]:
         """根据ID列表批量获取大块数据
         
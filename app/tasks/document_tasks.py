@@ -2,12 +2,64 @@
 定义文档处理相关的Celery任务
 """
 import asyncio
+import threading
+from typing import Optional
 from app.celery_app import celery_app
 from app.services.document_service import DocumentService
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# 每个worker进程共享一个常驻事件循环，避免每个任务重建事件循环、连接池和服务
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_loop_lock = threading.Lock()
+_doc_service: Optional[DocumentService] = None
+_doc_service_lock: Optional[asyncio.Lock] = None
+
+
+def _get_worker_loop() -> asyncio.AbstractEventLoop:
+    """获取（必要时启动）后台常驻事件循环"""
+    global _worker_loop
+    with _worker_loop_lock:
+        if _worker_loop is None or _worker_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever,
+                name="document-task-loop",
+                daemon=True
+            )
+            thread.start()
+            _worker_loop = loop
+            logger.info("[Celery Task] 后台事件循环已启动")
+        return _worker_loop
+
+
+async def _get_document_service() -> DocumentService:
+    """获取在后台事件循环中初始化的文档服务（只初始化一次）"""
+    global _doc_service, _doc_service_lock
+    if _doc_service_lock is None:
+        _doc_service_lock = asyncio.Lock()
+    async with _doc_service_lock:
+        if _doc_service is None:
+            doc_service = DocumentService()
+            await doc_service.async_init()
+            _doc_service = doc_service
+    return _doc_service
+
+
+async def _process_document(document_id: str):
+    """在后台事件循环中处理文档"""
+    doc_service = await _get_document_service()
+
+    # 从数据库获取文档对象
+    document = await doc_service.get_document(document_id)
+    if not document:
+        logger.error(f"[Celery Task] 找不到文档: {document_id}")
+        return
+
+    await doc_service.process_document(document)
+
+
 @celery_app.task(name='app.tasks.document_tasks.process_document_task')
 def process_document_task(document_id: str):
     """
@@ -20,23 +72,11 @@ def process_document_task(document_id: str):
     print(f"--- CELERY TASK RECEIVED: process_document_task for doc_id: {document_id} ---")
     # ------------------
     logger.info(f"[Celery Task] 开始处理文档: {document_id}")
-    
-    async def main():
-        # 在异步环境中运行文档处理服务
-        doc_service = DocumentService()
-        await doc_service.async_init()
-        
-        # 从数据库获取文档对象
-        document = await doc_service.get_document(document_id)
-        if not document:
-            logger.error(f"[Celery Task] 找不到文档: {document_id}")
-            return
-
-        await doc_service.process_document(document)
 
     try:
-        # 运行异步主函数
-        asyncio.run(main())
+        # 提交到常驻事件循环并等待完成
+        future = asyncio.run_coroutine_threadsafe(_process_document(document_id), _get_worker_loop())
+        future.result()
         logger.info(f"[Celery Task] 成功完成文档处理: {document_id}")
     except Exception as e:
         logger.error(f"[Celery Task] 文档处理失败: {document_id}, 错误: {e}", exc_info=True)
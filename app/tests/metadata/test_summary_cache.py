@@ -0,0 +1,146 @@
+"""摘要缓存与千问客户端摘要缓存测试"""
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from app.metadata.cache.summary_cache import RedisSummaryCache, SummaryCache, build_summary_cache_key
+from app.metadata.clients.qianwen_client import QianwenClient
+
+
+class TestSummaryCache:
+    """摘要缓存测试"""
+
+    def test_cache_key_is_deterministic(self):
+        """测试缓存键稳定且区分参数"""
+        key = build_summary_cache_key("高血压的治疗", 200, "中文", "qwen3-8b")
+        assert key == build_summary_cache_key("高血压的治疗", 200, "中文", "qwen3-8b")
+        assert key != build_summary_cache_key("高血压的治疗", 100, "中文", "qwen3-8b")
+        assert key != build_summary_cache_key("高血压的治疗", 200, "English", "qwen3-8b")
+
+    @pytest.mark.asyncio
+    async def test_get_set_and_lru_eviction(self):
+        """测试读写与LRU淘汰"""
+        cache = SummaryCache(max_size=2)
+        await cache.set("a", "摘要A")
+        await cache.set("b", "摘要B")
+
+        # 访问a使其成为最近使用
+        assert await cache.get("a") == "摘要A"
+        await cache.set("c", "摘要C")
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == "摘要A"
+        assert await cache.get("c") == "摘要C"
+
+        stats = cache.get_stats()
+        assert stats["size"] == 2
+        assert stats["hits"] == 3
+        assert stats["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_redis_cache_degrades_to_miss(self):
+        """测试Redis不可用时按未命中处理"""
+        cache = RedisSummaryCache("redis://127.0.0.1:1/0", ttl=60)
+
+        await cache.set("key", "摘要")
+        assert await cache.get("key") is None
+        assert cache.get_stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_redis_cache_skips_redis_during_cooldown(self):
+        """测试Redis失败后冷却期内不再访问Redis"""
+        cache = RedisSummaryCache("redis://127.0.0.1:1/0", ttl=60, cooldown=60)
+        redis_client = AsyncMock()
+        redis_client.get.side_effect = ConnectionError("Redis不可用")
+        cache._get_client = Mock(return_value=redis_client)
+
+        assert await cache.get("a") is None
+        assert await cache.get("b") is None
+        await cache.set("b", "摘要")
+
+        assert redis_client.get.await_count == 1
+        redis_client.setex.assert_not_awaited()
+        assert cache.get_stats()["available"] is False
+        assert cache.get_stats()["misses"] == 2
+
+        # 冷却期结束后重新尝试Redis
+        cache._unavailable_until = 0.0
+        redis_client.get.side_effect = None
+        redis_client.get.return_value = "摘要"
+        assert await cache.get("b") == "摘要"
+
+
+class TestQianwenClientSummaryCache:
+    """千问客户端摘要缓存集成测试"""
+
+    @pytest.fixture
+    def client(self):
+        """创建使用独立缓存的客户端"""
+        return QianwenClient(
+            api_key="test-key",
+            base_url="https://test.api.com",
+            summary_cache=SummaryCache()
+        )
+
+    @pytest.mark.asyncio
+    async def test_duplicate_text_hits_cache(self, client):
+        """测试相同文本只调用一次API"""
+        client.generate_text = AsyncMock(return_value="这是摘要")
+        text = "急性心肌梗死是冠状动脉急性、持续性缺血缺氧所引起的心肌坏死。" * 20
+
+        first = await client.generate_summary(text)
+        second = await client.generate_summary(text)
+
+        assert first == second == "这是摘要"
+        assert client.generate_text.await_count == 1
+
+        stats = client.get_stats()
+        assert stats["cache_hits"] == 1
+        assert stats["cache_misses"] == 1
+        assert stats["cache_hit_rate"] == 0.5
+        assert stats["latency_p50"] is not None
+
+    @pytest.mark.asyncio
+    async def test_cache_can_be_disabled(self):
+        """测试关闭缓存后每次都调用API"""
+        client = QianwenClient(
+            api_key="test-key",
+            base_url="https://test.api.com",
+            summary_cache=SummaryCache(),
+            enable_summary_cache=False
+        )
+        client.generate_text = AsyncMock(return_value="这是摘要")
+        text = "心力衰竭是多种原因导致心脏结构和功能异常改变的一组临床综合征。" * 20
+
+        await client.generate_summary(text)
+        await client.generate_summary(text)
+
+        assert client.generate_text.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_short_text_skips_api(self, client):
+        """测试短文本直接返回原文"""
+        client.generate_text = AsyncMock(return_value="这是摘要")
+        text = "高血压患者应低盐饮食。"
+
+        assert await client.generate_summary(text, max_length=200) == text
+        client.generate_text.assert_not_awaited()
+
+        client.skip_short_texts = False
+        assert await client.generate_summary(text, max_length=200) == "这是摘要"
+        assert client.generate_text.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_connection_pool_sized_from_concurrency(self):
+        """测试连接池大小随并发数配置"""
+        client = QianwenClient(
+            api_key="test-key",
+            base_url="https://test.api.com",
+            summary_cache=SummaryCache(),
+            max_concurrency=16
+        )
+        assert client.pool_size == 64
+
+        async with client:
+            assert client.connector.limit == 64
+            assert client.connector.limit_per_host == 64
@@ -12,7 +12,9 @@ from app.metadata.models.metadata_models import (
     DocumentSummary, KeywordInfo, SummaryQuality, KeywordQuality,
     SummaryMethod, KeywordMethod, QualityLevel, MedicalCategory
 )
-from app.metadata.clients.qianwen_client import QianwenClient
+from app.metadata.cache.summary_cache import SummaryCache
+from app.metadata.clients.qianwen_client import QianwenAPIError, QianwenClient, RateLimitError
+from app.metadata.clients.token_budget import TokenBudgetLimiter
 from app.metadata.extractors.keybert_extractor import KeyBERTExtractor
 from app.metadata.evaluators.quality_evaluator import QualityEvaluator
 
@@ -82,6 +84,156 @@ class TestQianwenClient:
         stats = client.get_stats()
         assert all(v == 0 for v in stats.values())
 
+
+class TestQianwenClientBatchSummaries:
+    """千问客户端批量摘要测试"""
+
+    @pytest.mark.asyncio
+    async def test_batch_respects_max_concurrency(self):
+        """测试批量摘要在途请求数不超过并发上限且保持顺序"""
+        client = QianwenClient(
+            api_key="test-key",
+            base_url="https://test.api.com",
+            summary_cache=SummaryCache(),
+            max_concurrency=2
+        )
+        in_flight = 0
+        peak = 0
+
+        async def fake_generate_text(prompt, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if "失败" in prompt:
+                raise Exception("API错误")
+            return prompt[-12:]
+
+        client.generate_text = fake_generate_text
+        texts = [f"第{i}段医学文本内容，" * 30 for i in range(6)]
+        texts[3] = "这段文本会失败，" * 30
+
+        summaries = await client.batch_generate_summaries(texts)
+
+        assert peak == 2
+        assert len(summaries) == 6
+        assert summaries[3] == ""
+        assert summaries[0] == texts[0][-12:]
+        assert summaries[5] == texts[5][-12:]
+
+    @pytest.mark.asyncio
+    async def test_token_budget_blocks_until_refund(self):
+        """测试token额度耗尽时等待归还"""
+        limiter = TokenBudgetLimiter(budget=100, refund_time=0.05)
+        await limiter.acquire(80)
+        limiter.release_later(80)
+        assert limiter.available == 20
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await limiter.acquire(50)
+
+        assert loop.time() - start >= 0.04
+        assert limiter.available == 50
+        assert limiter.estimate_credits("字" * 3000, 200) == 100
+
+    @pytest.mark.asyncio
+    async def test_batch_deduplicates_texts(self):
+        """测试批次内重复文本只调用一次API"""
+        client = QianwenClient(
+            api_key="test-key",
+            base_url="https://test.api.com",
+            summary_cache=SummaryCache(),
+            enable_summary_cache=False
+        )
+        client.generate_text = AsyncMock(side_effect=["摘要A", "摘要B"])
+        text_a = "糖尿病是一组以高血糖为特征的代谢性疾病。" * 20
+        text_b = "慢性阻塞性肺疾病是一种常见的呼吸系统疾病。" * 20
+
+        summaries = await client.batch_generate_summaries([text_a, text_b, text_a, text_a])
+
+        assert summaries == ["摘要A", "摘要B", "摘要A", "摘要A"]
+        assert client.generate_text.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_delay_is_accepted_and_ignored(self):
+        """测试已废弃的batch_delay参数仍可传入且不再逐条等待"""
+        client = QianwenClient(
+            api_key="test-key",
+            base_url="https://test.api.com",
+            summary_cache=SummaryCache()
+        )
+        client.generate_text = AsyncMock(return_value="这是摘要")
+        texts = [f"第{i}段高血压治疗相关的医学文本内容。" * 20 for i in range(3)]
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        summaries = await client.batch_generate_summaries(texts, batch_delay=1.0)
+
+        assert summaries == ["这是摘要"] * 3
+        assert loop.time() - start < 1.0
+
+    @pytest.mark.asyncio
+    async def test_iter_yields_in_completion_order(self):
+        """测试流式接口按完成顺序产出结果"""
+        client = QianwenClient(
+            api_key="test-key",
+            base_url="https://test.api.com",
+            summary_cache=SummaryCache()
+        )
+
+        async def fake_generate_text(prompt, **kwargs):
+            await asyncio.sleep(0.05 if "慢" in prompt else 0)
+            return "慢摘要" if "慢" in prompt else "快摘要"
+
+        client.generate_text = fake_generate_text
+        texts = ["这是一段很慢的文本。" * 30, "这是一段很快的文本。" * 30]
+
+        results = [item async for item in client.iter_generate_summaries(texts)]
+
+        assert results == [(1, "快摘要"), (0, "慢摘要")]
+
+
+class TestQianwenClientRetry:
+    """千问客户端重试测试"""
+
+    @pytest.fixture
+    def client(self):
+        """创建快速退避的客户端"""
+        return QianwenClient(
+            api_key="test-key",
+            base_url="https://test.api.com",
+            summary_cache=SummaryCache(),
+            retry_delay=0.01
+        )
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_honors_retry_after(self, client):
+        """测试限流时按Retry-After重试"""
+        client._post_chat_completion = AsyncMock(
+            side_effect=[RateLimitError("限流", retry_after=0.02), "生成结果"]
+        )
+
+        assert await client.generate_text("测试") == "生成结果"
+        await client.close()
+        assert client._post_chat_completion.await_count == 2
+        assert client.get_stats()["retry_count"] == 1
+        assert client._get_retry_delay(0, RateLimitError("限流", retry_after=120)) == client.max_retry_delay
+
+    @pytest.mark.asyncio
+    async def test_client_error_is_not_retried(self, client):
+        """测试4xx错误不重试"""
+        client._post_chat_completion = AsyncMock(
+            side_effect=QianwenAPIError("参数错误", status=400)
+        )
+
+        with pytest.raises(QianwenAPIError):
+            await client.generate_text("测试")
+        await client.close()
+        assert client._post_chat_completion.await_count == 1
+
+
 class TestQualityEvaluator:
     """质量评估器单元测试"""
     
@@ -1,6 +1,7 @@
 """数据模型单元测试"""
 
 import pytest
+import numpy as np
 from datetime import datetime
 from typing import List, Dict, Any
 from pydantic import ValidationError
@@ -89,8 +90,23 @@ class TestDocumentModels:
         )
         
         assert chunk.id == "chunk-123"
-        assert chunk.embedding == embedding
+        assert chunk.embedding == np.asarray(embedding, dtype=np.float32).tobytes()
+        assert np.allclose(chunk.embedding_np, embedding)
+        assert np.allclose(chunk.model_dump(mode="json")["embedding"], embedding)
         assert chunk.metadata["source"] == "page_1"
+
+    def test_document_chunk_from_numpy(self):
+        """测试从NumPy数组创建文档块"""
+        embedding = np.arange(8, dtype=np.float64)
+        chunk = DocumentChunk.from_numpy(
+            embedding,
+            document_id="doc-123",
+            chunk_index=0,
+            content="Test content"
+        )
+
+        assert chunk.embedding_np.dtype == np.float32
+        assert np.array_equal(chunk.embedding_np, embedding)
     
     def test_processing_result_model(self):
         """测试处理结果模型"""
@@ -259,6 +275,13 @@ class TestQueryModels:
                 score=-0.1,  # 负数
                 source="test.pdf"
             )
+    
+    def test_search_result_is_frozen(self):
+        """测试搜索结果构建后只读"""
+        result = SearchResult(content="test", score=0.5, source="test.pdf")
+        
+        with pytest.raises(ValidationError):
+            result.score = 0.9
 
 
 class TestSessionModels:
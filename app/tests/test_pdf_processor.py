@@ -10,7 +10,7 @@ from unittest.mock import Mock, patch, AsyncMock, MagicMock
 from pathlib import Path
 
 from app.processors.pdf_processor import PDFProcessor
-from app.processors.enhanced_pdf_processor import EnhancedPDFProcessor
+from app.processors.enhanced_pdf_processor import EnhancedPDFProcessor, _extract_page_range
 
 
 class TestPDFProcessor:
@@ -134,6 +134,75 @@ class TestEnhancedPDFProcessor:
                     assert len(result["tables"]) == 1
                     assert len(result["references"]) == 2
     
+    def test_summarize_elements(self, enhanced_pdf_processor):
+        """测试一次遍历元素得到文档元数据与合并文本"""
+        elements = [
+            {"type": "narrative_text", "content": "正文", "page_number": 1, "length": 2, "is_structured": True},
+            {"type": "title", "content": "标题", "page_number": 3, "length": 2, "is_structured": True},
+            {"type": "table", "content": "", "page_number": 2, "length": 0, "is_structured": False},
+        ]
+        metadata, text = enhanced_pdf_processor._summarize_elements(elements)
+        
+        assert text == "正文\n\n标题"
+        assert metadata == enhanced_pdf_processor.extract_document_metadata(elements)
+        assert metadata["total_pages"] == 3
+        assert metadata["total_length"] == 4
+        assert metadata["element_types"] == {"narrative_text": 1, "title": 1, "table": 1}
+        assert metadata["has_tables"] and metadata["has_structured_content"]
+        assert metadata["title"] == "标题"
+    
+    def test_iter_structured_elements_page_numbers(self, enhanced_pdf_processor):
+        """测试不构建完整元数据时页码与to_dict结果一致"""
+        class ElementMetadata:
+            def __init__(self, page_number):
+                self.page_number = page_number
+            
+            def to_dict(self):
+                return {"page_number": self.page_number} if self.page_number is not None else {}
+        
+        class Title:
+            def __init__(self, text, page_number):
+                self.text = text
+                self.metadata = ElementMetadata(page_number)
+        
+        elements = [Title("指南", 2), Title("  ", 3), Title("背景", None), Title("结论", 1)]
+        full = list(enhanced_pdf_processor._iter_structured_elements(elements, need_metadata=True))
+        light = list(enhanced_pdf_processor._iter_structured_elements(elements, need_metadata=False))
+        
+        assert [el["page_number"] for el in light] == [el["page_number"] for el in full] == [2, 2, 1]
+        assert [el["metadata"] for el in light] == [{"page_number": 2}, {"page_number": 2}, {"page_number": 1}]
+        assert [el["type"] for el in light] == ["document_title", "section_title", "title"]
+    
+    def test_process_uses_parse_cache(self, tmp_path):
+        """测试相同内容的PDF第二次处理直接读取解析缓存"""
+        test_pdf_path = tmp_path / "test.pdf"
+        test_pdf_path.write_bytes(b"%PDF-1.4\ntest content")
+        cache_dir = str(tmp_path / "cache")
+        elements = [{"type": "title", "content": "标题", "page_number": 1, "length": 2, "is_structured": True}]
+        
+        with patch.object(EnhancedPDFProcessor, 'extract_structured_elements', return_value=elements) as mock_extract:
+            first = EnhancedPDFProcessor(str(test_pdf_path), cache_dir=cache_dir).process()
+            second = EnhancedPDFProcessor(str(test_pdf_path), pdf_bytes=test_pdf_path.read_bytes(),
+                                          cache_dir=cache_dir).process()
+            assert second == first
+            assert mock_extract.call_count == 1
+            
+            test_pdf_path.write_bytes(b"%PDF-1.4\nchanged content")
+            EnhancedPDFProcessor(str(test_pdf_path), cache_dir=cache_dir).process()
+            assert mock_extract.call_count == 2
+    
+    def test_extract_page_range_offsets_page_numbers(self):
+        """测试按页段并行解析时页码换算回原PDF"""
+        elements = [
+            {"type": "narrative_text", "content": "正文", "page_number": 1, "metadata": {"page_number": 1}},
+            {"type": "table", "content": "表格", "page_number": 2, "metadata": {"page_number": 2, "table_index": 0}},
+        ]
+        with patch.object(EnhancedPDFProcessor, 'extract_structured_elements', return_value=elements):
+            shifted = _extract_page_range("/data/test.pdf", b"%PDF-1.4", 10, False, {})
+        
+        assert [el["page_number"] for el in shifted] == [11, 12]
+        assert [el["metadata"]["page_number"] for el in shifted] == [11, 12]
+    
     def test_extract_tables(self, enhanced_pdf_processor, tmp_path):
         """测试表格提取功能"""
         # 创建测试PDF文件
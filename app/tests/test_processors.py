@@ -5,8 +5,10 @@
 
 import pytest
 import os
+import json
 import uuid
 import tempfile
+import tarfile
 from unittest.mock import Mock, patch, AsyncMock, MagicMock
 from pathlib import Path
 
@@ -146,6 +148,87 @@ class TestDocumentProcessor:
         with pytest.raises(ValueError, match="Unsupported file type"):
             await document_processor.process_single_document(test_unsupported_path, test_document_id)
     
+    def test_process_all_documents_skips_failed_files(self, document_processor, tmp_dirs):
+        """测试批量并行处理，失败文件被跳过"""
+        input_dir, output_dir = tmp_dirs
+        
+        for name in ("a.txt", "b.txt"):
+            with open(os.path.join(input_dir, name), "w", encoding="utf-8") as f:
+                f.write(f"急性心肌梗死是冠状动脉急性、持续性缺血缺氧所引起的心肌坏死。{name}")
+        # 非UTF-8文本会解析失败，非支持类型不会被处理
+        with open(os.path.join(input_dir, "bad.txt"), "wb") as f:
+            f.write(b"\xff\xfe\xfa")
+        with open(os.path.join(input_dir, "ignored.exe"), "wb") as f:
+            f.write(b"binary content")
+        os.makedirs(os.path.join(input_dir, "subdir.txt"))
+        
+        results = document_processor.process_all_documents(max_workers=2)
+        
+        assert [os.path.basename(r["file_path"]) for r in results] == ["a.txt", "b.txt"]
+        assert "text" not in results[0] and results[0]["text_length"] > 0
+        assert os.path.exists(results[0]["output_path"])
+        assert not os.path.exists(os.path.join(output_dir, "bad.txt.txt"))
+    
+    def test_save_text_output_keeps_source_extension(self, document_processor, tmp_dirs):
+        """测试同名不同类型的文档写出到不同文件"""
+        _, output_dir = tmp_dirs
+        
+        output_paths = [
+            document_processor._save_text_output({"text": f"{name}正文"}, f"/data/{name}")
+            for name in ("a.pdf", "a.md", "a.txt")
+        ]
+        
+        assert [os.path.basename(path) for path in output_paths] == ["a.pdf.txt", "a.md.txt", "a.txt.txt"]
+        with open(output_paths[0], encoding="utf-8") as f:
+            assert f.read() == "a.pdf正文"
+    
+    def test_process_all_documents_keeps_source_in_input_dir(self, mock_vector_store, tmp_dirs):
+        """测试输出目录与输入目录相同时不覆盖源文件"""
+        input_dir, _ = tmp_dirs
+        source_text = "急性心肌梗死是冠状动脉急性、持续性缺血缺氧所引起的心肌坏死。\n\n\n第 1 页"
+        source_path = os.path.join(input_dir, "a.txt")
+        with open(source_path, "w", encoding="utf-8") as f:
+            f.write(source_text)
+        processor = DocumentProcessor(input_dir=input_dir, output_dir=input_dir, vector_store=mock_vector_store)
+        
+        results = processor.process_all_documents(max_workers=1)
+        
+        with open(source_path, encoding="utf-8") as f:
+            assert f.read() == source_text
+        assert results[0]["output_path"] == os.path.join(input_dir, "a.txt.txt")
+    
+    def test_save_processing_results_legacy_outputs(self, document_processor, tmp_dirs):
+        """测试旧版分版本输出文件仅在legacy_outputs开启时写出"""
+        _, output_dir = tmp_dirs
+        result = {
+            "raw_text": "原始文本",
+            "cleaned_text": "清洗文本",
+            "standardized_text": "标准化文本",
+            "structured_text": "",
+            "metadata": {"file_type": "pdf"},
+            "processing_stats": {"chunks": 1},
+        }
+
+        document_processor._save_processing_results(result, "/data/doc.pdf")
+        assert os.listdir(output_dir) == ["doc.pdf.json"]
+
+        document_processor.legacy_outputs = True
+        document_processor._save_processing_results(result, "/data/doc.pdf")
+        assert sorted(os.listdir(output_dir)) == [
+            "doc.pdf.json", "doc_cleaned.txt", "doc_metadata.json", "doc_raw.txt",
+            "doc_standardized.txt", "doc_stats.json",
+        ]
+
+        for name in os.listdir(output_dir):
+            os.remove(os.path.join(output_dir, name))
+        document_processor.compress_outputs = True
+        document_processor._save_processing_results(result, "/data/doc.pdf")
+        assert sorted(os.listdir(output_dir)) == [
+            "doc.pdf.json.gz", "doc_metadata.json", "doc_stats.json", "doc_texts.tar.gz",
+        ]
+        with tarfile.open(os.path.join(output_dir, "doc_texts.tar.gz")) as tar:
+            assert tar.getnames() == ["doc_raw.txt", "doc_cleaned.txt", "doc_standardized.txt"]
+
     def test_split_into_chunks(self, document_processor):
         """测试文本分块功能"""
         text = "这是第一句话。这是第二句话。这是第三句话，包含用于测试分块功能的内容。"
@@ -154,6 +237,13 @@ class TestDocumentProcessor:
         # 验证结果
         assert len(chunks) > 0
         assert all(len(chunk) <= 1000 for chunk in chunks)  # 假设最大块大小为1000字符
+    
+    def test_split_into_chunks_breaks_at_last_sentence_ending(self, document_processor):
+        """测试分块断点取搜索窗口内最后一个句末标点"""
+        text = "a" * 90 + "。" + "b" * 30 + "!" + "c" * 100
+        chunks = document_processor._split_into_chunks(text, chunk_size=100, overlap=0)
+        
+        assert chunks == [text[:122], "c" * 100]
 
 
 class TestPDFProcessor:
@@ -266,6 +356,87 @@ class TestTextCleaner:
         assert len(cleaned_text) > 0
         assert "   " not in cleaned_text  # 多余空格应该被清理
         assert "\n\n\n" not in cleaned_text  # 多余换行符应该被清理
+    
+    def test_normalize_medical_terms(self, text_cleaner):
+        """测试医学缩写规范化"""
+        text = "AMI 患者, mi 病史; CT 检查 MRI."
+        normalized = text_cleaner.normalize_medical_terms(text)
+        
+        assert normalized == "急性心肌梗死 患者, 心肌梗死 病史; 计算机断层扫描 检查 磁共振成像."
+        assert text_cleaner.normalize_medical_terms("HTN", {"HTN": "高血压病"}) == "高血压病"
+    
+    def test_custom_term_matchers_are_cached(self, text_cleaner, monkeypatch):
+        """测试自定义术语匹配器按字典缓存并按LRU淘汰"""
+        monkeypatch.setattr("app.processors.cleaners.CUSTOM_TERM_CACHE_SIZE", 2)
+        
+        first = text_cleaner._get_custom_term_matchers({"HTN": "高血压病"})
+        assert text_cleaner._get_custom_term_matchers({"HTN": "高血压病"}) is first
+        
+        text_cleaner._get_custom_term_matchers({"DM2": "2型糖尿病"})
+        text_cleaner._get_custom_term_matchers({"HTN": "高血压病"})
+        text_cleaner._get_custom_term_matchers({"AKI": "急性肾损伤"})
+        assert list(text_cleaner._custom_term_cache) == [(("HTN", "高血压病"),), (("AKI", "急性肾损伤"),)]
+        assert text_cleaner.normalize_medical_terms("AKI", {"AKI": "急性肾损伤"}) == "急性肾损伤"
+    
+    def test_normalize_medical_terms_sequential(self, text_cleaner):
+        """测试逐个缩写替换模式（替换结果可被后续缩写再次替换）"""
+        custom_terms = {"HTN": "CT 检查"}
+        
+        assert text_cleaner.normalize_medical_terms("HTN", custom_terms) == "CT 检查"
+        assert text_cleaner.normalize_medical_terms("HTN", custom_terms, sequential=True) == "计算机断层扫描 检查"
+    
+    def test_normalize_medical_terms_regex_fallback(self, text_cleaner):
+        """测试未安装pyahocorasick时的正则回退结果一致"""
+        text = "AMI 患者, mi 病史; CT 检查 MRI. AMIX ICU_1 ıcu"
+        expected = text_cleaner.normalize_medical_terms(text)
+        
+        text_cleaner.abbreviation_automaton = None
+        assert text_cleaner.normalize_medical_terms(text) == expected
+    
+    def test_clean_basic_fixes_ocr_noise(self, text_cleaner):
+        """测试全角字符转换与重复标点合并"""
+        cleaned = text_cleaner.clean_basic("ＥＦ值２０２０年下降至３５％。。，结论!!?")
+        
+        assert cleaned == "EF值2020年下降至35％。结论!"
+
+    def test_clean_basic_doi_issn_passes_in_order(self, text_cleaner):
+        """测试DOI/ISSN按DOI、ISSN、doi顺序逐个删除，且在去除首尾空白之后"""
+        assert text_cleaner.clean_basic("ISSN: 1234-5678 DOI:\n\n正文第一段") == ""
+        assert text_cleaner.clean_basic("doi: 10.1/x DOI:\n下一行正文") == ""
+        assert text_cleaner.clean_basic("正文 DOI:  ") == "正文 DOI:"
+        assert text_cleaner._clean_basic_batch(["正文 DOI:  ", "ISSN: 1 DOI:\n正文"]) == ["正文 DOI:", ""]
+
+    def test_remove_headers_footers(self, text_cleaner):
+        """测试页眉页脚行删除"""
+        text = "·指南与共识·\n正文第一段\nvol. 12\n通信作者：李四\n正文第二段"
+        
+        assert text_cleaner.remove_headers_footers(text) == "正文第一段\n正文第二段"
+    
+    def test_extract_structured_content(self, text_cleaner):
+        """测试结构化内容分类"""
+        text = "一、概述\n• 胸痛\n[1] Smith J.\n正文内容\n1. " + "x" * 120
+        structured = text_cleaner.extract_structured_content(text)
+        
+        assert structured["titles"] == ["一、概述"]
+        assert structured["lists"] == ["• 胸痛", "1. " + "x" * 120]
+        assert structured["references"] == ["[1] Smith J."]
+        assert structured["paragraphs"] == ["正文内容"]
+    
+    def test_clean_batch_matches_per_text_cleaning(self, text_cleaner):
+        """测试批量清洗与逐篇清洗结果一致"""
+        texts = [
+            "急性心肌梗死 AMI 患者的诊治。DOI:",
+            "第 3 页",
+            "中华医学杂志 2020",
+            "",
+            "心衰 患者见https://x.org，，随访 CT 检查结果",
+        ]
+        custom_terms = {"HTN": "高血压病"}
+        
+        assert text_cleaner.clean_batch(texts, custom_terms) == [
+            text_cleaner.clean_comprehensive(text, None, custom_terms) for text in texts
+        ]
+        assert text_cleaner.clean_batch([]) == []
 
 
 class TestTextQualityFilter:
@@ -327,4 +498,40 @@ class TestMedicalTerminologyStandardizer:
         # 验证结果
         assert standardized_text is not None
         assert len(standardized_text) > 0
-        # 具体的标准化规则取决于实现，这里只验证基本功能
\ No newline at end of file
+        # 具体的标准化规则取决于实现，这里只验证基本功能
+
+    def test_extract_medical_entities_without_automaton(self, terminology_standardizer):
+        """测试未安装pyahocorasick时逐个术语扫描的实体结果一致"""
+        text = "患者MI后行PCI，服用阿司匹林。HTN_1 及 DM；CTA 检查"
+        standardized_text, entities = terminology_standardizer.standardize_and_extract(text)
+        expected = {category: sorted(terms) for category, terms in entities.items()}
+        
+        terminology_standardizer.entity_automaton = None
+        fallback = terminology_standardizer.extract_medical_entities(standardized_text)
+        assert {category: sorted(terms) for category, terms in fallback.items()} == expected
+    
+    def test_standardize_text_without_automaton(self, terminology_standardizer):
+        """测试只应用候选规则与逐条应用全部规则的标准化结果一致"""
+        text = "患者 HTN ，ck-mb 升高；mı 后 高血压病 (AMI) 及 CK-MB\nDM"
+        standardized_text = terminology_standardizer.standardize_text(text)
+        assert standardized_text != text
+        
+        terminology_standardizer.standardization_automaton = None
+        assert terminology_standardizer.standardize_text(text) == standardized_text
+    
+    def test_get_term_variations_after_custom_dictionary(self, tmp_path):
+        """测试加载自定义词典后术语变体索引随之更新"""
+        dict_path = tmp_path / "custom_terms.json"
+        dict_path.write_text(json.dumps({"standard_terms": {"心梗死": "心肌梗死"}}), encoding="utf-8")
+        
+        variations = MedicalTerminologyStandardizer(str(dict_path)).get_term_variations("心肌梗死")
+        assert "心梗死" in variations
+        assert "心肌梗塞" in variations
+        assert "心肌梗死" in variations
+    
+    def test_standardize_text_inside_chinese_prose(self, terminology_standardizer):
+        """测试中文术语在句中被标准化，且不改写已是标准形式的术语"""
+        text = "患者既往心肌梗塞，左心衰竭及房颤，急性mi后行PCI，2型糖尿病"
+        assert terminology_standardizer.standardize_text(text) == (
+            "患者既往心肌梗死，左心衰竭及心房颤动，急性心肌梗死后行PCI，2型糖尿病"
+        )
@@ -4,7 +4,7 @@
 1. 使用SmallToBigSplitter进行两阶段分块
 2. 为大块生成摘要和关键词
 3. 将大块存储到MySQL
-4. 将小块存储到向量数据库
+4. 将小块存储到向量数据库（与第3步并行）
 """
 
 import asyncio
@@ -30,6 +30,10 @@ class SmallToBigProcessor:
         self.vector_store = None
         self.embedding_model = None
         
+        # LLM客户端在首次使用时解析，并在同一事件循环内复用
+        self._llm_client = None
+        self._llm_client_loop = None
+        
         logger.info("小-大检索处理器初始化完成")
     
     async def async_init(self):
@@ -76,11 +80,12 @@ class SmallToBigProcessor:
             # 第二步：为大块生成摘要和关键词
             await self._generate_parent_chunks_metadata(parent_chunks)
             
-            # 第三步：保存大块到MySQL
-            await self._save_parent_chunks_to_mysql(parent_chunks)
-            
-            # 第四步：为小块添加元数据并保存到向量数据库
-            await self._save_child_chunks_to_vector_db(child_chunks, parent_chunks, document_title)
+            # 第三、四步：保存大块到MySQL，同时为小块添加元数据并保存到向量数据库；
+            # 两者互不依赖，MySQL写入在线程中执行，与小块的嵌入和写入重叠
+            await asyncio.gather(
+                self._save_parent_chunks_to_mysql(parent_chunks),
+                self._save_child_chunks_to_vector_db(child_chunks, parent_chunks, document_title)
+            )
             
             # 获取统计信息
             stats = self.splitter.get_chunk_statistics(parent_chunks, child_chunks)
@@ -103,6 +108,22 @@ class SmallToBigProcessor:
                 'error': str(e)
             }
     
+    async def _get_llm_client(self):
+        """获取复用的LLM客户端
+        
+        客户端与连接池绑定事件循环，事件循环变化时重新获取
+        """
+        loop = asyncio.get_running_loop()
+        if self._llm_client is None or self._llm_client_loop is not loop:
+            from app.metadata.clients.qianwen_client import get_metadata_qianwen_client
+            self._llm_client = await get_metadata_qianwen_client()
+            self._llm_client_loop = loop
+        
+        session = self._llm_client.session
+        if not session or session.closed:
+            await self._llm_client.__aenter__()
+        return self._llm_client
+    
     async def _generate_parent_chunks_metadata(self, parent_chunks: List[Dict[str, Any]]):
         """为大块生成摘要和关键词
         
@@ -112,24 +133,21 @@ class SmallToBigProcessor:
         try:
             logger.info(f"开始为 {len(parent_chunks)} 个大块生成摘要和关键词")
             
-            # 导入LLM客户端
-            from app.metadata.clients.qianwen_client import get_metadata_qianwen_client
-            llm_client = await get_metadata_qianwen_client()
+            # 复用LLM客户端及其连接池，不在每个文档结束时关闭会话
+            llm_client = await self._get_llm_client()
 
             # 创建一个信号量，限制并发数为5
             concurrency_limit = 5
             semaphore = asyncio.Semaphore(concurrency_limit)
             
-            # 使用异步上下文管理器
-            async with llm_client:
-                # 并发生成摘要和关键词
-                tasks = []
-                for chunk in parent_chunks:
-                    task = self._generate_single_chunk_metadata(llm_client, chunk, semaphore)
-                    tasks.append(task)
-                
-                # 批量执行
-                await asyncio.gather(*tasks)
+            # 并发生成摘要和关键词
+            tasks = []
+            for chunk in parent_chunks:
+                task = self._generate_single_chunk_metadata(llm_client, chunk, semaphore)
+                tasks.append(task)
+            
+            # 批量执行
+            await asyncio.gather(*tasks)
             
             logger.info("大块摘要和关键词生成完成")
             
@@ -232,18 +250,21 @@ class SmallToBigProcessor:
         try:
             logger.info(f"开始保存 {len(parent_chunks)} 个大块到MySQL")
             
-            for chunk in parent_chunks:
-                chunk_data = {
+            chunks_data = [
+                {
                     'id': chunk['id'],
                     'document_id': chunk['document_id'],
                     'content': chunk['content'],
                     'summary': chunk.get('summary', ''),
                     'keywords': chunk.get('keywords', '')
                 }
-                
-                success = self.db_manager.save_parent_chunk(chunk_data)
-                if not success:
-                    logger.warning(f"保存大块 {chunk['id']} 到MySQL失败")
+                for chunk in parent_chunks
+            ]
+            
+            # 一次批量写入，避免每个大块单独建连和往返
+            success = await asyncio.to_thread(self.db_manager.save_parent_chunks, chunks_data)
+            if not success:
+                logger.warning(f"批量保存 {len(chunks_data)} 个大块到MySQL失败")
             
             logger.info("大块保存到MySQL完成")
             
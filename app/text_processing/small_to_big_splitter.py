@@ -5,7 +5,7 @@
 2. 再将大块切分为小块(Child Chunks) - 256字符
 """
 
-import uuid
+import os
 from typing import List, Dict, Any, Tuple
 from app.core.config import get_settings
 from app.utils.logger import setup_logger
@@ -13,6 +13,30 @@ from app.embeddings.text_splitter import MedicalTextSplitter
 
 logger = setup_logger(__name__)
 
+# UUID4的版本号(4)和RFC 4122变体位，与uuid.UUID(version=4)的设置方式相同
+_UUID4_CLEAR_MASK = ~((0xf000 << 64) | (0xc000 << 48))
+_UUID4_SET_BITS = (4 << 76) | (0x8000 << 48)
+
+
+def _uuid4_strings(count: int) -> List[str]:
+    """批量生成UUID4字符串，格式与str(uuid.uuid4())一致
+    
+    所有随机字节一次读取，避免逐个构造UUID对象
+    
+    Args:
+        count: 需要的ID数量
+        
+    Returns:
+        UUID4字符串列表
+    """
+    raw = os.urandom(16 * count)
+    ids = []
+    for offset in range(0, 16 * count, 16):
+        value = int.from_bytes(raw[offset:offset + 16], 'big') & _UUID4_CLEAR_MASK | _UUID4_SET_BITS
+        hex_str = f"{value:032x}"
+        ids.append(f"{hex_str[:8]}-{hex_str[8:12]}-{hex_str[12:16]}-{hex_str[16:20]}-{hex_str[20:]}")
+    return ids
+
 
 class SmallToBigSplitter:
     """小-大检索分块器"""
@@ -51,9 +75,9 @@ class SmallToBigSplitter:
             # 第一阶段：使用 MedicalTextSplitter 切分为大块
             parent_chunk_texts = self.parent_splitter.split_text(content)
             parent_chunks = []
+            parent_chunk_ids = _uuid4_strings(len(parent_chunk_texts))
             
-            for chunk_index, chunk_content in enumerate(parent_chunk_texts):
-                parent_chunk_id = str(uuid.uuid4())
+            for chunk_index, (parent_chunk_id, chunk_content) in enumerate(zip(parent_chunk_ids, parent_chunk_texts)):
                 parent_chunk = {
                     'id': parent_chunk_id,
                     'document_id': document_id,
@@ -70,9 +94,9 @@ class SmallToBigSplitter:
             child_chunks = []
             for parent_chunk in parent_chunks:
                 child_chunk_texts = self.child_splitter.split_text(parent_chunk['content'])
+                child_chunk_ids = _uuid4_strings(len(child_chunk_texts))
                 
-                for child_index, child_content in enumerate(child_chunk_texts):
-                    child_chunk_id = str(uuid.uuid4())
+                for child_index, (child_chunk_id, child_content) in enumerate(zip(child_chunk_ids, child_chunk_texts)):
                     child_chunk = {
                         'id': child_chunk_id,
                         'parent_chunk_id': parent_chunk['id'],